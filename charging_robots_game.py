@@ -1,11 +1,14 @@
 import pygame
 import sys
+import argparse
 import random
 import math
+import numpy as np
 from charging_robots_simulation import ChargingSimulation, CHARGING_STATION_POS, PARK_WIDTH, PARK_HEIGHT
 
-# 初始化pygame
-pygame.init()
+# 初始化pygame；由main_controller启动时已初始化的则跳过
+if not pygame.get_init():
+    pygame.init()
 
 # 颜色定义
 WHITE = (255, 255, 255)
@@ -15,6 +18,11 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 GRAY = (200, 200, 200)
+ORANGE = (255, 165, 0)
+
+# 状态到颜色的查找表，按状态整数编码顺序排列
+_VEH_COLOR = (RED, YELLOW, BLUE, GREEN, YELLOW)  # WAIT, ASSIGNED, CHARGING, DONE, FAILED
+_ROBOT_COLOR = (GRAY, BLUE, GREEN, YELLOW, ORANGE)  # IDLE, MOVING, CHARGING_V, RETURNING, SWAPPING
 
 # 游戏设置
 SCREEN_WIDTH = 1200
@@ -22,157 +30,312 @@ SCREEN_HEIGHT = 800
 SCALE_FACTOR = min(SCREEN_WIDTH / PARK_WIDTH, SCREEN_HEIGHT / PARK_HEIGHT) * 0.8
 OFFSET_X = (SCREEN_WIDTH - PARK_WIDTH * SCALE_FACTOR) / 2
 OFFSET_Y = (SCREEN_HEIGHT - PARK_HEIGHT * SCALE_FACTOR) / 2
+SCREEN_SCALE = np.float32(SCALE_FACTOR)
+SCREEN_OFFSET = np.array([OFFSET_X, OFFSET_Y], dtype=np.float32)
+
+# 园区可见范围（含20像素边距），范围外的实体直接跳过绘制
+CLIP_MARGIN = 20
+_CLIP_L = OFFSET_X - CLIP_MARGIN
+_CLIP_T = OFFSET_Y - CLIP_MARGIN
+_CLIP_R = OFFSET_X + PARK_WIDTH * SCALE_FACTOR + CLIP_MARGIN
+_CLIP_B = OFFSET_Y + PARK_HEIGHT * SCALE_FACTOR + CLIP_MARGIN
 FPS = 60
+DEBUG_DRAW = False  # 为True时绘制过程中检查实体数据并打印异常
+SIM_STEP = 1.0 / FPS  # 速度为1时每个模拟分钟对应的真实时间（秒）
+MAX_SPEED = 50
+MAX_STEPS_PER_FRAME = 500  # 单帧最多追赶的模拟步数，避免渲染卡顿后越积越多
 
-# 创建屏幕
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Charging Robots Simulation")
+# 屏幕和静态背景由open_display创建，窗口关闭（pygame.display.quit）后可再次打开
+screen = None
+_bg_surf = None
 clock = pygame.time.Clock()
 
 # 字体
 font = pygame.font.SysFont(None, 24)
 large_font = pygame.font.SysFont(None, 32)
 
+# 电量文本缓存：(当前电量, 需求电量)取整 -> "当前/需求"，与render_cached配合省去每帧格式化和渲染
+CHARGE_STR_CACHE_LIMIT = 10000
+_CHARGE_STR_CACHE = {}
+
+# 复用的矩形对象，绘制时只更新位置，避免每帧创建Rect
+BATTERY_BAR_WIDTH = 30
+_ROBOT_OUTER = pygame.Rect(0, 0, 18, 18)
+_ROBOT_INNER = pygame.Rect(0, 0, 16, 16)
+_BAR_BG = pygame.Rect(0, 0, BATTERY_BAR_WIDTH + 2, 7)
+_BAR_FG = pygame.Rect(0, 0, BATTERY_BAR_WIDTH, 5)
+_BAR_HALF = BATTERY_BAR_WIDTH // 2
+# 电量百分比(0-100) -> 电量条颜色
+_BAR_COLORS = tuple(GREEN if p > 20 else YELLOW if p > 10 else RED for p in range(101))
+
+# 状态面板区域
+PANEL_RECT = pygame.Rect(0, 0, 300, 150)
+
+# 脏矩形数量超过该值时改为整屏刷新，避免逐矩形开销超过节省的像素拷贝
+DIRTY_RECT_LIMIT = 50
+# 脏矩形按屏幕分块合并，分块数保证合并后本帧与上一帧的矩形总数不超过上限
+DIRTY_TILE_COLS = 6
+DIRTY_TILE_ROWS = 4
+
+# 渲染结果缓存：(文本, 颜色, 字体) -> Surface
+TEXT_CACHE_LIMIT = 4096
+_text_cache = {}
+
+def w2s(x, y, _sf=SCALE_FACTOR, _ox=OFFSET_X, _oy=OFFSET_Y):
+    """将单个世界坐标转换为屏幕坐标，缩放和偏移常量在定义时绑定"""
+    return (x * _sf + _ox, y * _sf + _oy)
+
 def world_to_screen(pos):
     """将世界坐标转换为屏幕坐标"""
-    x, y = pos
-    screen_x = x * SCALE_FACTOR + OFFSET_X
-    screen_y = y * SCALE_FACTOR + OFFSET_Y
-    return (screen_x, screen_y)
+    return w2s(pos[0], pos[1])
+
+def transform_positions(world, _scale=SCREEN_SCALE, _off=SCREEN_OFFSET):
+    """批量将(N, 2)世界坐标数组转换为float32屏幕坐标"""
+    return world * _scale + _off
+
+def positions_to_screen(world):
+    """批量将(N, 2)世界坐标数组转换为屏幕坐标，返回整数坐标列表"""
+    return transform_positions(world).astype(np.int32).tolist()
 
-def draw_vehicle(vehicle):
-    """绘制车辆"""
-    pos = world_to_screen(vehicle.position)
+def entities_to_screen(entities):
+    """批量将实体的世界坐标转换为屏幕坐标，返回整数坐标列表"""
+    world = np.fromiter((p for entity in entities for p in entity.position),
+                        dtype=np.float32, count=2 * len(entities)).reshape(-1, 2)
+    return positions_to_screen(world)
+
+def render_cached(text, color, text_font=None):
+    """带缓存的font.render，相同文本和颜色只渲染一次"""
+    if text_font is None:
+        text_font = font
+    key = (text, color, text_font)
+    surface = _text_cache.get(key)
+    if surface is None:
+        if len(_text_cache) >= TEXT_CACHE_LIMIT:
+            # 超出上限时淘汰最早缓存的条目
+            del _text_cache[next(iter(_text_cache))]
+        # 转换为屏幕像素格式，绘制时无需再逐次转换
+        surface = text_font.render(text, True, color).convert_alpha()
+        _text_cache[key] = surface
+    return surface
+
+def warm_text_cache(sim):
+    """预先渲染车辆和机器人的ID文本"""
+    for vehicle in sim.vehicles:
+        render_cached(str(vehicle.id), BLACK)
+    for robot in sim.robots:
+        render_cached(str(robot.id), WHITE)
+
+def fmt_charge(cur, req):
+    """格式化电量文本，按取整后的数值缓存"""
+    key = (round(cur), round(req))
+    text = _CHARGE_STR_CACHE.get(key)
+    if text is None:
+        if len(_CHARGE_STR_CACHE) >= CHARGE_STR_CACHE_LIMIT:
+            _CHARGE_STR_CACHE.clear()
+        text = f"{key[0]}/{key[1]}"
+        _CHARGE_STR_CACHE[key] = text
+    return text
+
+def blit_batch(blit_seq):
+    """一次性绘制(surface, dest)序列，pygame-ce使用fblits，原版pygame退回blits"""
+    if hasattr(screen, "fblits"):
+        screen.fblits(blit_seq)
+    else:
+        screen.blits(blit_seq, doreturn=False)
+
+def blit_rects(blit_seq):
+    """计算(surface, dest)序列中各文字覆盖的矩形"""
+    return [pygame.Rect(dest[0], dest[1], surface.get_width(), surface.get_height())
+            for surface, dest in blit_seq]
+
+def draw_vehicle(vehicle_id, pos, status, current_charge, required_charge, dirty,
+                 _draw_circle=pygame.draw.circle, _render=render_cached, _fmt=fmt_charge):
+    """绘制车辆，参数直接取自模拟的列存储，pos为屏幕坐标；
+    文字部分以(surface, dest)序列返回，由调用方批量绘制，本次绘制覆盖的区域追加到dirty。
+    下划线开头的默认参数在定义时绑定全局函数，省去每次调用的全局查找"""
+    x, y = pos
+    if not (_CLIP_L <= x <= _CLIP_R and _CLIP_T <= y <= _CLIP_B):
+        return []
     
     # 根据状态选择颜色
-    if vehicle.status == "waiting":
-        color = RED
-    elif vehicle.status == "charging":
-        color = BLUE
-    elif vehicle.status == "completed":
-        color = GREEN
-    else:  # assigned or failed
-        color = YELLOW
+    color = _VEH_COLOR[status]
         
     # 绘制车辆形状
-    pygame.draw.circle(screen, color, (int(pos[0]), int(pos[1])), 10)
+    area = _draw_circle(screen, color, pos, 10)
     
     # 显示车辆ID
-    id_text = font.render(str(vehicle.id), True, BLACK)
-    screen.blit(id_text, (int(pos[0]) - 5, int(pos[1]) - 8))
+    blit_seq = [(_render(str(vehicle_id), BLACK), (x - 5, y - 8))]
     
     # 显示电量
-    charge_text = font.render(f"{vehicle.current_charge:.0f}/{vehicle.required_charge:.0f}", True, BLACK)
-    screen.blit(charge_text, (int(pos[0]) - 20, int(pos[1]) + 10))
+    blit_seq.append((_render(_fmt(current_charge, required_charge), BLACK), (x - 20, y + 10)))
+    dirty.append(area.unionall(blit_rects(blit_seq)))
+    return blit_seq
 
-def draw_robot(robot):
-    """改进机器人绘制逻辑"""
-    if robot is None or not hasattr(robot, 'position'):
-        return
-        
-    pos = world_to_screen(robot.position)
+def draw_robot(robot, pos, dirty, links,
+               _draw_rect=pygame.draw.rect, _render=render_cached, _w2s=w2s):
+    """改进机器人绘制逻辑，pos为屏幕坐标；文字部分以(surface, dest)序列返回，
+    本次绘制覆盖的区域追加到dirty，到目标车辆的连接线追加到links由draw_links统一绘制。
+    下划线开头的默认参数在定义时绑定"""
+    blit_seq = []
+    if robot is None:
+        return blit_seq
+    if not (_CLIP_L <= pos[0] <= _CLIP_R and _CLIP_T <= pos[1] <= _CLIP_B):
+        return blit_seq
     
     # 根据状态选择颜色
-    if robot.status == "idle":
-        color = GRAY
-    elif robot.status == "moving_to_vehicle":
-        color = BLUE
-    elif robot.status == "returning":
-        color = YELLOW
-    elif robot.status == "charging_vehicle":
-        color = GREEN
-    else:  # 其他状态
-        color = ORANGE
+    color = _ROBOT_COLOR[robot.status]
     
     # 绘制机器人外框
-    robot_rect = pygame.Rect(0, 0, 18, 18)
-    robot_rect.center = pos
-    pygame.draw.rect(screen, BLACK, robot_rect)
+    _ROBOT_OUTER.center = pos
+    area = _draw_rect(screen, BLACK, _ROBOT_OUTER)
     
     # 绘制机器人内部
-    inner_rect = pygame.Rect(0, 0, 16, 16)
-    inner_rect.center = pos
-    pygame.draw.rect(screen, color, inner_rect)
+    _ROBOT_INNER.center = pos
+    _draw_rect(screen, color, _ROBOT_INNER)
     
     # 显示机器人ID
-    id_text = font.render(str(robot.id), True, WHITE)
+    id_text = _render(str(robot.id), WHITE)
     id_rect = id_text.get_rect(center=pos)
-    screen.blit(id_text, id_rect)
+    blit_seq.append((id_text, id_rect))
     
     # 显示电池电量（如果有电池）- 在机器人下方
-    if hasattr(robot, 'battery') and robot.battery and robot.battery is not None:
-        try:
-            # 检查battery.current_charge属性是否存在且不为None
-            if hasattr(robot.battery, 'current_charge') and robot.battery.current_charge is not None:
-                battery_text = font.render(f"{int(robot.battery.current_charge)}", True, BLACK)
-                battery_rect = battery_text.get_rect(midtop=(pos[0], pos[1] + 15))
-                screen.blit(battery_text, battery_rect)
-                
-                # 添加电池电量百分比可视化
-                max_capacity = robot.battery.max_capacity if hasattr(robot.battery, 'max_capacity') else 50.0
-                percent = min(100, int(robot.battery.current_charge / max_capacity * 100))
-                bar_width = 30
-                pygame.draw.rect(screen, BLACK, (pos[0] - bar_width/2 - 1, pos[1] + 35 - 1, bar_width + 2, 7))
-                if percent > 20:
-                    bar_color = GREEN
-                elif percent > 10:
-                    bar_color = YELLOW
-                else:
-                    bar_color = RED
-                pygame.draw.rect(screen, bar_color, (pos[0] - bar_width/2, pos[1] + 35, bar_width * percent / 100, 5))
-        except (AttributeError, TypeError, ZeroDivisionError) as e:
-            # 调试输出，帮助识别问题
-            if debug_mode:
-                print(f"电池绘制错误: {e} - 机器人ID: {robot.id}")
+    battery = robot.battery
+    if battery is not None and battery.current_charge is not None:
+        battery_text = _render(str(int(battery.current_charge)), BLACK)
+        battery_rect = battery_text.get_rect(midtop=(pos[0], pos[1] + 15))
+        blit_seq.append((battery_text, battery_rect))
+        
+        # 添加电池电量百分比可视化
+        percent = max(0, min(100, int(battery.current_charge * 100 / battery.max_capacity)))
+        x, y = pos
+        _BAR_BG.topleft = (x - _BAR_HALF - 1, y + 34)
+        area.union_ip(_draw_rect(screen, BLACK, _BAR_BG))
+        _BAR_FG.topleft = (x - _BAR_HALF, y + 35)
+        _BAR_FG.width = BATTERY_BAR_WIDTH * percent // 100
+        _draw_rect(screen, _BAR_COLORS[percent], _BAR_FG)
+    
+    # 如果机器人有目标车辆，记录连接线
+    target_vehicle = robot.target_vehicle
+    if target_vehicle is not None:
+        if DEBUG_DRAW:
+            try:
+                tx, ty = target_vehicle.position
+            except (AttributeError, TypeError) as e:
+                print(f"机器人{robot.id}的目标车辆位置无效: {e}")
+            else:
+                links.append((pos, _w2s(tx, ty)))
+        else:
+            tx, ty = target_vehicle.position
+            links.append((pos, _w2s(tx, ty)))
     
-    # 如果机器人有目标车辆，绘制连接线
-    if hasattr(robot, 'target_vehicle') and robot.target_vehicle:
-        try:
-            target_pos = world_to_screen(robot.target_vehicle.position)
-            pygame.draw.line(screen, BLUE, pos, target_pos, 2)
-        except (AttributeError, TypeError) as e:
-            # 处理可能的属性错误
-            pass
-
-def draw_charging_station():
+    dirty.append(area.unionall(blit_rects(blit_seq)))
+    return blit_seq
+
+def draw_links(links, dirty, _draw_line=pygame.draw.line):
+    """集中绘制机器人到目标车辆的连接线，覆盖区域追加到dirty"""
+    append = dirty.append
+    for start, end in links:
+        append(_draw_line(screen, BLUE, start, end, 2))
+
+def coalesce_rects(rects, _tw=SCREEN_WIDTH // DIRTY_TILE_COLS,
+                   _th=SCREEN_HEIGHT // DIRTY_TILE_ROWS):
+    """按屏幕分块合并脏矩形：中心落在同一块内的矩形取并集，结果数量不超过分块数"""
+    tiles = {}
+    for rect in rects:
+        key = (rect.centerx // _tw, rect.centery // _th)
+        merged = tiles.get(key)
+        if merged is None:
+            # 复制一份再合并，避免修改调用方仍在使用的矩形
+            tiles[key] = rect.copy()
+        else:
+            merged.union_ip(rect)
+    return list(tiles.values())
+
+def draw_charging_station(surface):
     """绘制充电站"""
     pos = world_to_screen(CHARGING_STATION_POS)
-    pygame.draw.rect(screen, GREEN, (int(pos[0]) - 20, int(pos[1]) - 20, 40, 40))
-    station_text = font.render("CS", True, BLACK)
-    screen.blit(station_text, (int(pos[0]) - 10, int(pos[1]) - 8))
-
-def draw_status_panel(sim):
-    """绘制状态面板"""
-    # 背景
-    pygame.draw.rect(screen, WHITE, (0, 0, 300, 150))
-    pygame.draw.rect(screen, BLACK, (0, 0, 300, 150), 1)
+    pygame.draw.rect(surface, GREEN, (int(pos[0]) - 20, int(pos[1]) - 20, 40, 40))
+    station_text = render_cached("CS", BLACK)
+    surface.blit(station_text, (int(pos[0]) - 10, int(pos[1]) - 8))
+
+def build_background():
+    """绘制静态背景：园区边界、充电站和状态面板边框"""
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    surface.fill(WHITE)
+    park_rect = pygame.Rect(
+        OFFSET_X, OFFSET_Y, 
+        PARK_WIDTH * SCALE_FACTOR, PARK_HEIGHT * SCALE_FACTOR
+    )
+    pygame.draw.rect(surface, BLACK, park_rect, 1)
+    draw_charging_station(surface)
+    pygame.draw.rect(surface, BLACK, PANEL_RECT, 1)
+    return surface
+
+def draw_status_panel(sim, _render=render_cached):
+    """绘制状态面板，返回面板区域"""
+    _blit = screen.blit  # 窗口可能被重新创建，不能在定义时绑定
+    # 背景：从静态背景恢复面板区域
+    _blit(_bg_surf, PANEL_RECT, PANEL_RECT)
     
     # 模拟时间
-    time_text = large_font.render(f"Time: {sim.current_time//60}:{sim.current_time%60:02d}", True, BLACK)
-    screen.blit(time_text, (10, 10))
+    time_text = _render(f"Time: {sim.current_time//60}:{sim.current_time%60:02d}", BLACK, large_font)
+    _blit(time_text, (10, 10))
     
     # 统计信息
-    completed_text = font.render(f"Completed: {sim.stats['completed_count']}", True, GREEN)
-    screen.blit(completed_text, (10, 50))
+    stats = sim.stats
+    completed_text = _render(f"Completed: {stats['completed_count']}", GREEN)
+    _blit(completed_text, (10, 50))
     
-    failed_text = font.render(f"Failed: {sim.stats['failed_count']}", True, RED)
-    screen.blit(failed_text, (10, 80))
+    failed_text = _render(f"Failed: {stats['failed_count']}", RED)
+    _blit(failed_text, (10, 80))
     
-    total = sim.stats['completed_count'] + sim.stats['failed_count']
-    rate = 0 if total == 0 else (sim.stats['completed_count'] / total * 100)
-    rate_text = font.render(f"Completion Rate: {rate:.1f}%", True, BLUE)
-    screen.blit(rate_text, (10, 110))
+    total = stats['completed_count'] + stats['failed_count']
+    rate = 0 if total == 0 else (stats['completed_count'] / total * 100)
+    rate_text = _render(f"Completion Rate: {rate:.1f}%", BLUE)
+    _blit(rate_text, (10, 110))
+    return PANEL_RECT
+
+def open_display():
+    """创建游戏窗口并绘制静态背景，返回屏幕Surface；
+    优先使用双缓冲和SDL2渲染器并开启垂直同步，不支持时退回普通软件窗口"""
+    global screen, _bg_surf
+    try:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT),
+                                         pygame.DOUBLEBUF | pygame.SCALED, vsync=1)
+    except pygame.error:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Charging Robots Simulation")
+    # 静态背景每次打开窗口时绘制一次
+    _bg_surf = build_background()
+    return screen
+
+def run_game(scale="中规模", strategy="nearest_first", speed=1, render_every_n_frames=1):
+    """运行游戏主循环
 
-def run_game(scale="中规模", strategy="nearest_first", speed=1):
-    """运行游戏主循环"""
+    模拟推进与渲染解耦：按真实经过的时间累积模拟步数，渲染帧率由FPS限制，
+    render_every_n_frames大于1时每n帧才绘制一次。
+    """
+    # 窗口尚未打开（或已被关闭）时先创建
+    if pygame.display.get_surface() is None:
+        open_display()
+    
     # 创建模拟
-    sim = ChargingSimulation(scale=scale, scheduling_strategy=strategy)
+    sim = ChargingSimulation(scale=scale, scheduling_strategy=strategy, verbose=False)
     sim.setup()
+    warm_text_cache(sim)
+    
+    # 上一帧绘制过的区域，首帧视为整屏
+    prev_dirty = [screen.get_rect()]
     
     running = True
     paused = False
+    accum = 0.0  # 尚未执行的模拟时间（以真实秒计）
+    frame = 0
+    clock.tick()
     
     while running:
+        dt = clock.tick(FPS) / 1000.0
+        
         # 处理事件
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -181,78 +344,109 @@ def run_game(scale="中规模", strategy="nearest_first", speed=1):
                 if event.key == pygame.K_SPACE:
                     paused = not paused
                 elif event.key == pygame.K_UP:
-                    speed = min(10, speed + 1)
+                    speed = min(MAX_SPEED, speed + 1)
                 elif event.key == pygame.K_DOWN:
                     speed = max(1, speed - 1)
                 elif event.key == pygame.K_ESCAPE:
                     running = False
         
-        # 清屏
-        screen.fill(WHITE)
+        # 如果没有暂停，按累积的时间推进模拟
+        if not paused:
+            accum += dt * speed
+            steps = min(int(accum / SIM_STEP), MAX_STEPS_PER_FRAME)
+            if steps:
+                sim.step_batch(steps, until=24 * 60)
+                accum = min(accum - steps * SIM_STEP, SIM_STEP)
+            
+            # 处理模拟结束
+            if sim.current_time >= 24 * 60:  # 24小时
+                sim.calculate_final_stats()
+                print("模拟完成")
+                print(f"完成率: {sim.stats['completion_rate']:.2f}%")
+                print(f"平均等待时间: {sim.stats['avg_waiting_time']:.2f}分钟")
+                print(f"平均充电时间: {sim.stats['avg_charging_time']:.2f}分钟")
+                running = False
         
-        # 绘制园区边界
-        park_rect = pygame.Rect(
-            OFFSET_X, OFFSET_Y, 
-            PARK_WIDTH * SCALE_FACTOR, PARK_HEIGHT * SCALE_FACTOR
-        )
-        pygame.draw.rect(screen, BLACK, park_rect, 1)
+        frame += 1
+        if frame % render_every_n_frames:
+            continue
         
-        # 绘制充电站
-        draw_charging_station()
+        # 用静态背景擦除上一帧绘制过的区域
+        if len(prev_dirty) > DIRTY_RECT_LIMIT:
+            screen.blit(_bg_surf, (0, 0))
+        else:
+            for rect in prev_dirty:
+                screen.blit(_bg_surf, rect, rect)
         
-        # 如果没有暂停，更新模拟状态
-        if not paused:
-            for _ in range(speed):
-                # 执行模拟的一个时间步
-                sim.update_status()
-                sim.assign_tasks()
-                
-                # 增加当前时间
-                sim.current_time += 1
-                
-                # 处理模拟结束
-                if sim.current_time >= 24 * 60:  # 24小时
-                    sim.calculate_final_stats()
-                    print("模拟完成")
-                    print(f"完成率: {sim.stats['completion_rate']:.2f}%")
-                    print(f"平均等待时间: {sim.stats['avg_waiting_time']:.2f}分钟")
-                    print(f"平均充电时间: {sim.stats['avg_charging_time']:.2f}分钟")
-                    running = False
-                    break
+        # 绘制所有实体，坐标变换每帧批量完成一次，文字统一收集后一次性批量绘制
+        dirty = []
+        blit_seq = []
+        # 车辆直接遍历模拟的列存储，已到达的车辆对应前len(sim.vehicles)项
+        arrived = len(sim.vehicles)
+        veh_screen = positions_to_screen(sim.veh_pos[:arrived])
+        veh_status = sim.veh_status[:arrived].tolist()
+        veh_charge = sim.veh_charge[:arrived].tolist()
+        veh_req_charge = sim.veh_req_charge[:arrived].tolist()
+        for i in range(arrived):
+            blit_seq.extend(draw_vehicle(i, veh_screen[i], veh_status[i],
+                                         veh_charge[i], veh_req_charge[i], dirty))
         
-        # 绘制所有实体
-        for vehicle in sim.vehicles:
-            draw_vehicle(vehicle)
+        links = []
+        for robot, pos in zip(sim.robots, entities_to_screen(sim.robots)):
+            blit_seq.extend(draw_robot(robot, pos, dirty, links))
+        draw_links(links, dirty)
         
-        for robot in sim.robots:
-            draw_robot(robot)
+        blit_batch(blit_seq)
         
         # 绘制状态面板
-        draw_status_panel(sim)
+        dirty.append(draw_status_panel(sim))
         
         # 显示模拟速度
-        speed_text = font.render(f"Speed: {speed}x", True, BLACK)
-        screen.blit(speed_text, (SCREEN_WIDTH - 100, 10))
+        speed_text = render_cached(f"Speed: {speed}x", BLACK)
+        dirty.append(screen.blit(speed_text, (SCREEN_WIDTH - 100, 10)))
         
         # 如果暂停，显示暂停文本
         if paused:
-            pause_text = large_font.render("PAUSED", True, RED)
-            screen.blit(pause_text, (SCREEN_WIDTH//2 - 50, 10))
+            pause_text = render_cached("PAUSED", RED, large_font)
+            dirty.append(screen.blit(pause_text, (SCREEN_WIDTH//2 - 50, 10)))
         
-        # 更新屏幕
-        pygame.display.flip()
-        clock.tick(FPS)
+        # 更新屏幕：只提交本帧和上一帧绘制过的区域，按分块合并后数量仍过多时整屏刷新
+        dirty = coalesce_rects(dirty)
+        update_rects = coalesce_rects(prev_dirty + dirty)
+        if len(update_rects) > DIRTY_RECT_LIMIT:
+            pygame.display.flip()
+        else:
+            pygame.display.update(update_rects)
+        prev_dirty = dirty
+    
+    # 提前退出（ESC或关闭窗口）时按已模拟的部分计算统计，调用方总能拿到完整的统计项
+    if sim.current_time < 24 * 60:
+        sim.calculate_final_stats()
     
-    pygame.quit()
+    # 不在这里关闭pygame，窗口和预渲染的资源可以被下一次调用复用
+    return sim.stats
+
+def simulate_only(sim, until_minutes=24 * 60):
+    """不渲染，直接推进模拟到指定时间，用于性能分析和回归检查"""
+    sim.step_batch(until_minutes, until=until_minutes)
+    sim.calculate_final_stats()
     return sim.stats
 
 if __name__ == "__main__":
-    # 选择要运行的规模和策略
-    scale = "中规模"
-    strategy = "nearest_first"
+    parser = argparse.ArgumentParser(description="充电机器人模拟可视化")
+    parser.add_argument("--scale", default="中规模", help="问题规模")
+    parser.add_argument("--strategy", default="nearest_first", help="调度策略")
+    parser.add_argument("--no-render", action="store_true", help="不打开绘制循环，只运行模拟")
+    args = parser.parse_args()
     
-    # 运行游戏
-    stats = run_game(scale, strategy)
+    if args.no_render:
+        sim = ChargingSimulation(scale=args.scale, scheduling_strategy=args.strategy, verbose=False)
+        sim.setup()
+        stats = simulate_only(sim)
+    else:
+        # 运行游戏
+        stats = run_game(args.scale, args.strategy)
+        pygame.quit()
     
     # 打印最终统计
     print("\n最终统计：")
@@ -1,9 +1,34 @@
 import numpy as np
 import heapq
+import matplotlib
+matplotlib.use('Agg')  # 只输出图片文件，不需要交互式后端
 import matplotlib.pyplot as plt
+from matplotlib.transforms import offset_copy
 from collections import defaultdict, deque
-import random
 import time
+import math
+import itertools
+import bisect
+import os
+import hashlib
+import pickle
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from numba import njit
+except ImportError:
+    # 未安装numba时退化为普通Python函数
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    # 未安装scipy时混合策略退化为逐个机器人的贪心分配
+    linear_sum_assignment = None
 
 # 常量定义
 MAX_SIM_TIME = 300 * 60  # 24小时，以分钟为单位
@@ -39,9 +64,271 @@ PROBLEM_SCALES = {
     }
 }
 
+# 园区按2x2划分为四个区域：zone1左下、zone2右下、zone3左上、zone4右上（y向上增大），
+# 分界线上的点归入编号较小的区域
+ZONE_NAMES = ("zone1", "zone2", "zone3", "zone4")
+_HALF_W = PARK_WIDTH / 2
+_HALF_H = PARK_HEIGHT / 2
+
+def zone_index(x, y):
+    """计算位置所在区域在ZONE_NAMES中的下标"""
+    return (x > _HALF_W) | ((y > _HALF_H) << 1)
+
+def pairwise_distances(a, b):
+    """计算两组坐标之间的距离矩阵，a为(M, 2)，b为(N, 2)，返回(M, N)"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    return np.hypot(a[:, None, 0] - b[None, :, 0], a[:, None, 1] - b[None, :, 1])
+
+# 最近充电站查找表：园区按50米划分网格，预先计算每个格子中心最近的充电站下标
+STATION_GRID_CELL = 50
+_GRID_NX = -(-PARK_WIDTH // STATION_GRID_CELL)
+_GRID_NY = -(-PARK_HEIGHT // STATION_GRID_CELL)
+_cell_centers = np.stack(np.meshgrid((np.arange(_GRID_NX) + 0.5) * STATION_GRID_CELL,
+                                     (np.arange(_GRID_NY) + 0.5) * STATION_GRID_CELL,
+                                     indexing="ij"), axis=-1).reshape(-1, 2)
+_NEAREST_STATION_GRID = pairwise_distances(_cell_centers, CHARGING_STATIONS).argmin(axis=1) \
+    .astype(np.int8).reshape(_GRID_NX, _GRID_NY).tolist()
+del _cell_centers
+
+def nearest_station_for(x, y):
+    """查表得到离位置(x, y)最近的充电站"""
+    gx = min(max(int(x // STATION_GRID_CELL), 0), _GRID_NX - 1)
+    gy = min(max(int(y // STATION_GRID_CELL), 0), _GRID_NY - 1)
+    return CHARGING_STATIONS[_NEAREST_STATION_GRID[gx][gy]]
+
+@njit(cache=True)
+def _charge_speed(charge_level, max_charge=100.0):
+    """分段充电速率：0-50%时快速充电，50-80%中速，80-100%慢速（kWh/分钟）"""
+    if charge_level / max_charge < 0.5:
+        return 2.5
+    elif charge_level / max_charge < 0.8:
+        return 1.8
+    else:
+        return 0.8
+
+# 机器人电池为返回充电站保留的电量（kWh）
+_CHARGE_RESERVE = 8.0
+
+@njit(cache=True)
+def _charge_step(vehicle_charge, battery_charge, efficiency):
+    """机器人为车辆充电一分钟，返回(电池消耗电量, 车辆实际获得电量)"""
+    # 不使用带默认值的参数：numba对省略参数的调用可能走慢速分派
+    max_transfer = min(_charge_speed(vehicle_charge), battery_charge - _CHARGE_RESERVE)
+    if max_transfer <= 0:
+        return 0.0, 0.0
+    return max_transfer, max_transfer * efficiency
+
+@njit(cache=True)
+def _needed_charge_time(current_charge, required_charge, max_charge=100.0):
+    """按分段充电速率计算从当前电量充到需求电量所需的时间（分钟）"""
+    if required_charge - current_charge <= 0:
+        return 0.0
+    
+    current_pct = current_charge / max_charge
+    required_pct = required_charge / max_charge
+    time_needed = 0.0
+    
+    # 从当前到50%
+    if current_pct < 0.5 and required_pct > 0.5:
+        time_needed += (0.5 - current_pct) * max_charge / 2.5
+        current_pct = 0.5
+    
+    # 从50%到80%
+    if current_pct < 0.8 and required_pct > 0.8:
+        time_needed += (0.8 - max(current_pct, 0.5)) * max_charge / 1.8
+        current_pct = 0.8
+    
+    # 从80%到目标
+    if required_pct > 0.8:
+        time_needed += (required_pct - max(current_pct, 0.8)) * max_charge / 0.8
+    
+    return time_needed
+
+@njit(cache=True)
+def _needed_charge_time_vec(current_charges, required_charges):
+    """批量计算所需充电时间"""
+    n = current_charges.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = _needed_charge_time(current_charges[i], required_charges[i])
+    return out
+
+@njit(cache=True)
+def _softmax_sample(q_values, u, temperature):
+    """按Softmax(q * temperature)的概率分布抽样，u为[0, 1)内的均匀随机数，返回选中的下标"""
+    n = q_values.shape[0]
+    m = q_values.max()
+    weights = np.exp((q_values - m) * temperature)
+    total = 0.0
+    for i in range(n):
+        total += weights[i]
+    # 与np.random.choice相同：按累积概率取第一个超过u的下标
+    cdf = np.cumsum(weights / total)
+    last = cdf[n - 1]
+    for i in range(n):
+        if cdf[i] / last > u:
+            return i
+    return n - 1
+
+@njit(cache=True)
+def _reward_kernel(done, failed, charge_added, charge_time, time_left, distance,
+                   battery_level, energy_needed, waiting_time):
+    """RL分配奖励，参数均为数值；charge_time为负数表示尚未结束充电"""
+    # 1. 任务完成情况奖励
+    if done:
+        # 基础完成奖励20，每增加1kWh奖励0.2，充电时间越短奖励越高（最低为1）
+        time_efficiency = max(1.0, 10 - min(9.0, charge_time / 30)) if charge_time >= 0 else 1.0
+        base_reward = 20 + charge_added * 0.2 + time_efficiency
+    elif failed:
+        # 任务失败惩罚
+        base_reward = -15.0
+    else:
+        # 进行中的任务给予中性评价
+        base_reward = 0.0
+    
+    # 2. 紧急性奖励 - 成功处理紧急车辆获得更高奖励
+    urgency_reward = 0.0
+    if done:
+        if time_left < 30:
+            urgency_reward = 10.0
+        elif time_left < 60:
+            urgency_reward = 5.0
+    
+    # 3. 距离惩罚，最多-10
+    distance_penalty = min(10.0, distance / 100)
+    
+    # 4. 电池管理奖励
+    if battery_level < energy_needed:
+        energy_penalty = -8.0  # 电量不足的风险惩罚
+    elif battery_level < energy_needed * 1.3:
+        energy_penalty = -3.0  # 电量略显不足
+    else:
+        energy_penalty = 0.0
+    
+    # 5. 等待时间奖励 - 为长时间等待的车辆提供服务
+    waiting_reward = 5.0 if done and waiting_time > 60 else 0.0
+    
+    return base_reward + urgency_reward - distance_penalty + energy_penalty + waiting_reward
+
+@njit(cache=True)
+def _completion_reward(charging_time, time_left_at_start):
+    """RL完成充电的奖励，charging_time为负数表示没有充电开始时间"""
+    reward = 10.0  # 基础奖励
+    if charging_time >= 0:
+        # 时间效率奖励
+        reward += min(10.0, 300 / max(10.0, charging_time))
+    if time_left_at_start < 60:
+        reward += 5  # 成功完成紧急任务
+    return reward
+
+@njit(cache=True)
+def _completion_rewards(charging_times, times_left_at_start):
+    """批量计算完成充电的奖励之和"""
+    total = 0.0
+    for i in range(charging_times.shape[0]):
+        total += _completion_reward(charging_times[i], times_left_at_start[i])
+    return total
+
+# 事件类型，同一时刻的事件按类型编号从小到大处理
+_EV_ARRIVE, _EV_COMPLETE, _EV_BAT = range(3)
+
+class BucketQueue:
+    """按整数分钟分桶的事件队列，元素为(时间, 事件类型, 序号, 数据)
+    
+    时间在[当前最早分钟, horizon]内的整数事件放入对应分钟的桶，桶内用小堆按(类型, 序号)排序；
+    其余事件（超出范围或非整数时间）放入后备堆。出队顺序与单个堆完全一致。
+    """
+    __slots__ = ("_buckets", "_min_t", "_overflow")
+    
+    def __init__(self, horizon):
+        self._buckets = [None] * (horizon + 1)
+        self._min_t = 0  # 早于该分钟的桶均已为空
+        self._overflow = []
+    
+    def push(self, event):
+        t = event[0]
+        if type(t) is int and self._min_t <= t < len(self._buckets):
+            bucket = self._buckets[t]
+            if bucket is None:
+                self._buckets[t] = [event]
+            else:
+                heapq.heappush(bucket, event)
+        else:
+            heapq.heappush(self._overflow, event)
+    
+    def extend(self, events):
+        """批量加入事件：先追加到各桶，最后对涉及的桶各建一次堆"""
+        buckets = self._buckets
+        lo, hi = self._min_t, len(buckets)
+        touched = set()
+        for event in events:
+            t = event[0]
+            if type(t) is int and lo <= t < hi:
+                bucket = buckets[t]
+                if bucket is None:
+                    buckets[t] = [event]
+                else:
+                    bucket.append(event)
+                    touched.add(t)
+            else:
+                self._overflow.append(event)
+        for t in touched:
+            heapq.heapify(buckets[t])
+        heapq.heapify(self._overflow)
+    
+    def pop(self, until):
+        """弹出时间不晚于until的最早事件，没有则返回None"""
+        buckets = self._buckets
+        last = min(int(until), len(buckets) - 1)
+        m = self._min_t
+        while m <= last and not buckets[m]:
+            m += 1
+        self._min_t = m
+        overflow = self._overflow
+        if m <= last:
+            bucket = buckets[m]
+            if overflow and overflow[0] < bucket[0]:
+                return heapq.heappop(overflow)
+            return heapq.heappop(bucket)
+        if overflow and overflow[0][0] <= until:
+            return heapq.heappop(overflow)
+        return None
+    
+    def __len__(self):
+        return sum(len(b) for b in self._buckets[self._min_t:] if b) + len(self._overflow)
+
+# 周期任务的间隔（分钟）
+ASSIGN_INTERVAL = 2    # 任务分配，从第0分钟开始
+PRIORITY_INTERVAL = 5  # 优先级更新，从第1分钟开始
+
+# update_status中批量移动的机器人按移动原因区分到达后的处理
+_MOVE_LOW_BATTERY, _MOVE_TO_VEHICLE, _MOVE_RETURN = range(3)
+# 移动的机器人少于该数量时逐个调用move_towards，比构造数组更快
+BATCH_MOVE_MIN = 32
+
+# 状态使用整数编码，名称表用于日志输出
+# 车辆状态：终止状态编号最大，可用 status >= DONE 判断是否已结束
+WAIT, ASSIGNED, CHARGING, DONE, FAILED = range(5)
+VEHICLE_STATUS_NAMES = ("waiting", "assigned", "charging", "completed", "failed")
+# 机器人状态
+IDLE, MOVING, CHARGING_V, RETURNING, SWAPPING = range(5)
+ROBOT_STATUS_NAMES = ("idle", "moving_to_vehicle", "charging_vehicle", "returning", "swapping_battery")
+# 电池状态
+BAT_AVAILABLE, BAT_IN_USE, BAT_CHARGING = range(3)
+BATTERY_STATUS_NAMES = ("available", "in-use", "charging")
+
 class Vehicle:
     """表示需要充电的车辆"""
+    __slots__ = ("_sim", "_idx", "_charge_time", "_status", "_current_charge",
+                 "id", "arrival_time", "position", "initial_charge", "departure_time",
+                 "required_charge", "assigned_robot", "charging_start_time",
+                 "charging_end_time", "priority")
+    
     def __init__(self, id, arrival_time, position, initial_charge, departure_time, required_charge):
+        self._sim = None  # 挂接的模拟，挂接后状态和电量同步写入模拟的列存储
+        self._idx = None  # 在列存储中的下标
+        self._charge_time = None  # 缓存的所需充电时间，电量变化时失效
         self.id = id
         self.arrival_time = arrival_time  # 到达时间（分钟）
         self.position = position  # (x, y)
@@ -49,11 +336,50 @@ class Vehicle:
         self.current_charge = initial_charge  # 当前电量
         self.departure_time = departure_time  # 离开时间（分钟）
         self.required_charge = required_charge  # 离开时需要的电量 (kWh)
-        self.status = "waiting"  # 状态: waiting, assigned, charging, completed, failed
+        self.status = WAIT  # 状态: WAIT, ASSIGNED, CHARGING, DONE, FAILED
         self.assigned_robot = None  # 分配的机器人
         self.charging_start_time = None  # 开始充电的时间
         self.charging_end_time = None  # 结束充电的时间
         self.priority = 0  # 用于优先级排序
+    
+    def attach(self, sim, idx):
+        """挂接到模拟的列存储，并写入当前状态"""
+        self._sim = sim
+        self._idx = idx
+        sim.veh_pos[idx] = self.position
+        sim.veh_charge[idx] = self._current_charge
+        sim.veh_req_charge[idx] = self.required_charge
+        sim.veh_arrival[idx] = self.arrival_time
+        sim.veh_departure[idx] = self.departure_time
+        sim.veh_status[idx] = self._status
+    
+    @property
+    def status(self):
+        return self._status
+    
+    @status.setter
+    def status(self, value):
+        self._status = value
+        if self._sim is not None:
+            self._sim.veh_status[self._idx] = value
+            waiting = self._sim._waiting
+            if value == WAIT:
+                if self.id not in waiting:
+                    waiting[self.id] = self
+                    self._sim._index_waiting(self, True)
+            elif waiting.pop(self.id, None) is not None:
+                self._sim._index_waiting(self, False)
+    
+    @property
+    def current_charge(self):
+        return self._current_charge
+    
+    @current_charge.setter
+    def current_charge(self, value):
+        self._current_charge = value
+        self._charge_time = None
+        if self._sim is not None:
+            self._sim.veh_charge[self._idx] = value
         
     def __lt__(self, other):
         # 先按优先级排序，然后按ID排序
@@ -63,46 +389,13 @@ class Vehicle:
         
     def charge_speed(self, charge_level):
         """改进的充电速率计算 - 更加现实的非线性充电曲线"""
-        max_charge = 100.0
-        
-        # 0-50%时快速充电，50-80%中速，80-100%慢速
-        if charge_level / max_charge < 0.5:
-            return 2.5  # 快速充电阶段: 2.5 kWh/分钟
-        elif charge_level / max_charge < 0.8:
-            return 1.8  # 中速充电阶段: 1.8 kWh/分钟
-        else:
-            return 0.8  # 慢速充电阶段: 0.8 kWh/分钟
+        return _charge_speed(charge_level)
     
     def needed_charge_time(self):
-        """使用分段计算充电时间"""
-        needed_charge = self.required_charge - self.current_charge
-        if needed_charge <= 0:
-            return 0
-        
-        max_charge = 100.0
-        current_pct = self.current_charge / max_charge
-        required_pct = self.required_charge / max_charge
-        time_needed = 0
-        
-        # 计算每个充电阶段需要的时间
-        if current_pct < 0.5 and required_pct > 0.5:
-            # 从当前到50%
-            charge_to_add = (0.5 - current_pct) * max_charge
-            time_needed += charge_to_add / 2.5
-            current_pct = 0.5
-        
-        if current_pct < 0.8 and required_pct > 0.8:
-            # 从50%到80%
-            charge_to_add = (0.8 - max(current_pct, 0.5)) * max_charge
-            time_needed += charge_to_add / 1.8
-            current_pct = 0.8
-            
-        if required_pct > 0.8:
-            # 从80%到目标
-            charge_to_add = (required_pct - max(current_pct, 0.8)) * max_charge
-            time_needed += charge_to_add / 0.8
-        
-        return time_needed
+        """使用分段计算充电时间；只有充电中的车辆电量会变化，其余车辆直接使用缓存"""
+        if self._charge_time is None:
+            self._charge_time = _needed_charge_time(self._current_charge, self.required_charge)
+        return self._charge_time
 
     def update_priority(self, current_time):
         """更新车辆优先级"""
@@ -123,16 +416,19 @@ class Vehicle:
         return self.priority
 
     def __repr__(self):
-        return f"Vehicle {self.id}: 位置{self.position}, 到达{self.arrival_time}分钟, 离开{self.departure_time}分钟, 电量{self.current_charge:.1f}/{self.required_charge}kWh, 状态{self.status}"
+        return f"Vehicle {self.id}: 位置{self.position}, 到达{self.arrival_time}分钟, 离开{self.departure_time}分钟, 电量{self.current_charge:.1f}/{self.required_charge}kWh, 状态{VEHICLE_STATUS_NAMES[self.status]}"
 
 
 class Battery:
     """表示可更换的电池"""
+    __slots__ = ("id", "max_capacity", "current_charge", "status", "location",
+                 "assigned_robot", "charge_start_time", "charging_station")
+    
     def __init__(self, id, max_capacity=60.0):  # 增加电池容量
         self.id = id
         self.max_capacity = max_capacity  # kWh
         self.current_charge = self.max_capacity  # 当前电量
-        self.status = "available"  # available, in-use, charging
+        self.status = BAT_AVAILABLE  # BAT_AVAILABLE, BAT_IN_USE, BAT_CHARGING
         self.location = CHARGING_STATION_POS  # 电池当前位置
         self.assigned_robot = None  # 使用这个电池的机器人
         self.charge_start_time = None  # 开始充电的时间
@@ -155,18 +451,23 @@ class Battery:
         return False
 
     def __repr__(self):
-        return f"Battery {self.id}: 电量{self.current_charge:.1f}/{self.max_capacity}kWh, 状态{self.status}, 位置{self.location}"
+        return f"Battery {self.id}: 电量{self.current_charge:.1f}/{self.max_capacity}kWh, 状态{BATTERY_STATUS_NAMES[self.status]}, 位置{self.location}"
 
 
 class Robot:
     """表示充电机器人"""
-    def __init__(self, id):
+    __slots__ = ("_sim", "_status", "id", "home_station", "position", "battery",
+                 "target_vehicle", "speed", "battery_consumption_rate",
+                 "idle_consumption_rate", "task_start_time", "estimated_completion_time",
+                 "last_assigned_time")
+    
+    def __init__(self, id, home_station):
+        self._sim = None  # 挂接的模拟，挂接后空闲状态同步到模拟的空闲机器人集合
         self.id = id
-        # 随机分配到一个充电站
-        self.home_station = random.choice(CHARGING_STATIONS)
+        self.home_station = home_station  # 所属充电站
         self.position = self.home_station  # 初始位置在充电站
         self.battery = None  # 当前使用的电池
-        self.status = "idle"  # idle, moving_to_vehicle, charging_vehicle, returning, swapping_battery
+        self.status = IDLE  # IDLE, MOVING, CHARGING_V, RETURNING, SWAPPING
         self.target_vehicle = None  # 目标车辆
         self.speed = 8.0  # 提高移动速度: 8米/分钟
         self.battery_consumption_rate = 0.04  # 降低耗电量: 0.04 kWh/分钟 （移动时）
@@ -175,17 +476,37 @@ class Robot:
         self.estimated_completion_time = None  # 预计完成当前任务的时间
         self.last_assigned_time = 0  # 上次被分配任务的时间
 
+    def attach(self, sim):
+        """挂接到模拟，并登记当前状态"""
+        self._sim = sim
+        self.status = self._status
+    
+    @property
+    def status(self):
+        return self._status
+    
+    @status.setter
+    def status(self, value):
+        self._status = value
+        if self._sim is not None:
+            idle_ids = self._sim._idle_robot_ids
+            if (value == IDLE) != (self.id in idle_ids):
+                if value == IDLE:
+                    idle_ids.add(self.id)
+                else:
+                    idle_ids.discard(self.id)
+                self._sim._sched_version += 1
+
     def assign_battery(self, battery):
         """分配电池给机器人"""
         self.battery = battery
-        battery.status = "in-use"
+        battery.status = BAT_IN_USE
         battery.assigned_robot = self
         battery.location = self.position
     
     def distance_to(self, position):
         """计算到某个位置的距离"""
-        return ((self.position[0] - position[0]) ** 2 + 
-                (self.position[1] - position[1]) ** 2) ** 0.5
+        return math.hypot(self.position[0] - position[0], self.position[1] - position[1])
     
     def time_to_reach(self, position):
         """计算到达某个位置需要的时间"""
@@ -194,18 +515,27 @@ class Robot:
     
     def find_nearest_charging_station(self):
         """找到最近的充电站"""
-        distances = [(station, self.distance_to(station)) for station in CHARGING_STATIONS]
-        distances.sort(key=lambda x: x[1])
-        return distances[0][0]
+        # 只有少数几个充电站，直接比较距离平方取最小，无需排序和开方
+        x, y = self.position
+        nearest = None
+        best = float('inf')
+        for station in CHARGING_STATIONS:
+            dx = station[0] - x
+            dy = station[1] - y
+            d2 = dx * dx + dy * dy
+            if d2 < best:
+                best = d2
+                nearest = station
+        return nearest
     
     def battery_needed_for_trip(self, position, return_trip=True):
         """计算去某个位置（可能还要返回）所需的电量"""
         one_way_time = self.time_to_reach(position)
         if return_trip:
-            # 找到离目标位置最近的充电站
-            nearest_station = self.find_nearest_charging_station()
-            target_to_station_dist = ((position[0] - nearest_station[0]) ** 2 + 
-                                     (position[1] - nearest_station[1]) ** 2) ** 0.5
+            # 找到离目标位置最近的充电站（查表）
+            nearest_station = nearest_station_for(position[0], position[1])
+            target_to_station_dist = math.hypot(position[0] - nearest_station[0],
+                                                position[1] - nearest_station[1])
             return_time = target_to_station_dist / self.speed
             total_time = one_way_time + return_time
         else:
@@ -232,7 +562,7 @@ class Robot:
         # 计算前进方向
         dx = position[0] - self.position[0]
         dy = position[1] - self.position[1]
-        distance = (dx**2 + dy**2) ** 0.5
+        distance = math.hypot(dx, dy)
         
         # 计算这段时间内可以移动的距离
         move_distance = min(distance, self.speed * time_elapsed)
@@ -261,7 +591,7 @@ class Robot:
             return False
     
     def __repr__(self):
-        status_info = f"Robot {self.id}: 位置{self.position}, 状态{self.status}"
+        status_info = f"Robot {self.id}: 位置{self.position}, 状态{ROBOT_STATUS_NAMES[self.status]}"
         if self.battery:
             status_info += f", 电池电量{self.battery.current_charge:.1f}kWh"
         else:
@@ -276,16 +606,64 @@ class Robot:
 class ChargingSimulation:
     """充电机器人调度模拟系统"""
     
-    def __init__(self, scale="小规模", scheduling_strategy="hybrid_strategy"):
+    def __init__(self, scale="小规模", scheduling_strategy="hybrid_strategy", seed=None, verbose=True):
         self.current_time = 0
-        self.events = []  # 优先队列，按时间排序的事件
+        self.scale = scale
+        # 种子可以是整数或SeedSequence；未指定时随机选取并记录下来，reset时可以重现同一问题实例
+        self._ss = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self._ss)  # 模拟使用的随机数生成器
+        self.events = BucketQueue(MAX_SIM_TIME)  # 事件队列，元素为(时间, 事件类型, 序号, 数据)
+        self._seq = itertools.count()  # 事件序号，同一时刻同类型的事件按加入顺序处理
+        self._handlers = (
+            self.handle_vehicle_arrival,
+            self.handle_task_completion,
+            self.handle_battery_charged,
+        )
         self.vehicles = []
-        self.waiting_vehicles = []  # 专门存储等待中的车辆，按优先级排序
+        # 状态为waiting的车辆（ID -> 车辆），按加入顺序排列，由Vehicle.status维护
+        self._waiting = {}
+        # 等待中车辆按优先级排序的列表，由update_vehicle_priorities从_waiting重建
+        self.waiting_vehicles = []
+        # 等待中车辆的有序索引，随车辆进出等待状态增量维护（等待期间电量和离开时间都不变）：
+        # 按(离开时间, ID)排序，以及按(-充电需求, ID)排序
+        self._by_deadline = []
+        self._by_need = []
         self.robots = []
+        self._idle_robot_ids = set()  # 状态为idle的机器人ID
         self.batteries = []
+        # 各充电站的可用电池，每个站一个按电池ID排序的小堆，元素为(电池ID, 电池)
+        self._avail_by_station = {station: [] for station in CHARGING_STATIONS}
         self.completed_vehicles = []
         self.failed_vehicles = []
-        self.logs = []
+        # verbose关闭时不记录日志；调用处用if self.verbose判断，避免无用的字符串格式化
+        self.verbose = verbose
+        self.logs = deque(maxlen=100)  # 只保留最近100条日志
+        
+        # 车辆的列存储（SoA），下标即车辆ID；车辆按到达顺序编号，
+        # 因此已到达的车辆恰好对应前len(self.vehicles)项
+        self.veh_pos = np.empty((0, 2), dtype=np.float32)
+        self.veh_status = np.empty(0, dtype=np.int8)
+        self.veh_charge = np.empty(0, dtype=np.float64)
+        self.veh_req_charge = np.empty(0, dtype=np.float64)
+        self.veh_arrival = np.empty(0, dtype=np.int32)
+        self.veh_departure = np.empty(0, dtype=np.int32)
+        
+        # 由update_vehicle_priorities填充，与waiting_vehicles顺序一致：剩余时间（至少1分钟）、已等待时间、充电需求
+        self._w_time_left = self._w_waiting_time = self._w_need = np.empty(0)
+        # 每轮任务分配前由_refresh_soa填充：等待车辆（列）与空闲机器人（行）的数组及距离矩阵
+        self._w_x = self._w_y = self._w_charge_time = self._w_dep = None
+        self._r_x = self._r_y = self._r_speed = self._r_bat = None
+        self._dists = None
+        # 分配时使用的矩阵缓冲区（名称 -> 一维数组），只在容量不足时重新分配
+        self._scratch = {}
+        # 每轮任务分配前由_refresh_trip_back填充：空闲机器人ID -> 返回最近充电站所需电量
+        self._trip_back = {}
+        
+        # 按离开时间排序的车辆下标，以及下一个待处理离开的位置
+        self._all_vehicles = []
+        self._dep_order = np.empty(0, dtype=np.intp)
+        self._dep_sorted = np.empty(0, dtype=np.int32)
+        self._dep_ptr = 0
         
         # 初始化规模参数
         params = PROBLEM_SCALES[scale]
@@ -303,27 +681,27 @@ class ChargingSimulation:
             "total_waiting_time": 0,
             "total_charging_time": 0,
             "robot_utilization": defaultdict(float),
+            "robot_completed_counts": defaultdict(int),  # 各机器人完成的充电任务数
             "battery_swaps": 0,
             "area_coverage": defaultdict(int),  # 记录各区域的服务情况
         }
         
-        # 定义园区区域划分
-        self.zones = {
-            "zone1": [(0, 0), (PARK_WIDTH/2, PARK_HEIGHT/2)],
-            "zone2": [(PARK_WIDTH/2, 0), (PARK_WIDTH, PARK_HEIGHT/2)],
-            "zone3": [(0, PARK_HEIGHT/2), (PARK_WIDTH/2, PARK_HEIGHT)],
-            "zone4": [(PARK_WIDTH/2, PARK_HEIGHT/2), (PARK_WIDTH, PARK_HEIGHT)]
-        }
+        # 各区域的服务计数，按ZONE_NAMES顺序，结束时写入stats["area_coverage"]
+        self._zone_counts = [0] * len(ZONE_NAMES)
         
-        # 缓存最近计算的分配
+        # 缓存最近计算的分配：车辆进出等待状态、机器人进出空闲状态时_sched_version加1
         self.last_assignment_time = 0
-        self.assignment_cache = {}
+        self._sched_version = 0
+        self._last_sched_version = -1
     
     def setup(self):
         """初始化模拟环境"""
-        # 创建机器人并分配到不同充电站
+        # 创建机器人并随机分配到不同充电站
+        home_idx = self.rng.integers(0, len(CHARGING_STATIONS), size=self.robots_count).tolist()
         for i in range(self.robots_count):
-            self.robots.append(Robot(i))
+            robot = Robot(i, CHARGING_STATIONS[home_idx[i]])
+            robot.attach(self)
+            self.robots.append(robot)
         
         # 创建电池并分布到不同充电站
         for i in range(self.batteries_count):
@@ -336,26 +714,30 @@ class ChargingSimulation:
         # 为每个机器人分配一个电池
         for i in range(min(self.robots_count, self.batteries_count)):
             self.robots[i].assign_battery(self.batteries[i])
+        for battery in self.batteries:
+            if battery.status == BAT_AVAILABLE:
+                self.release_battery(battery)
         
         # 生成车辆到达事件
         self.generate_vehicle_arrivals()
+    
+    def reset(self, strategy=None):
+        """用相同的种子重新生成同一问题实例并重新setup，可同时切换调度策略，便于在同一实例上比较策略
         
-        # 添加周期性任务分配事件 - 提高频率到每2分钟
-        heapq.heappush(self.events, (0, "assign_tasks"))
-        
-        # 添加周期性状态更新事件
-        heapq.heappush(self.events, (1, "update_status"))
-        
-        # 添加周期性优先级更新事件
-        heapq.heappush(self.events, (1, "update_priorities"))
+        只重置模拟状态；子类的附加状态（如RL的Q表）保留，分配用的缓冲区也继续复用。
+        """
+        scratch = self._scratch
+        ChargingSimulation.__init__(self, self.scale, strategy or self.scheduling_strategy,
+                                    self._ss, self.verbose)
+        self._scratch = scratch
+        self.setup()
     
     def generate_vehicle_arrivals(self):
         """生成车辆到达事件 - 更加真实的到达模式"""
         # 基于泊松分布生成车辆到达，但考虑高峰和低谷时段
-        total_minutes = MAX_SIM_TIME
-        
-        # 初始化车辆ID
-        vehicle_id = 0
+        rng = self.rng
+        minutes = np.arange(MAX_SIM_TIME)
+        hours = (minutes // 60) % 24
         
         # 定义一天中的高峰和低谷时段
         morning_peak_start = 7 * 60  # 早上7点
@@ -364,102 +746,78 @@ class ChargingSimulation:
         evening_peak_start = 17 * 60  # 下午5点
         evening_peak_end = 20 * 60    # 晚上8点
         
-        # 生成每分钟的车辆到达
-        for minute in range(total_minutes):
-            # 根据时段调整到达率
-            hour = (minute // 60) % 24
-            
-            if (morning_peak_start <= minute < morning_peak_end) or (evening_peak_start <= minute < evening_peak_end):
-                # 高峰时段，提高到达率
-                vehicles_per_minute = self.vehicles_per_hour / 40  # 提高1.5倍
-            elif hour >= 23 or hour < 6:
-                # 深夜时段，降低到达率
-                vehicles_per_minute = self.vehicles_per_hour / 180  # 降低至1/3
-            else:
-                # 正常时段
-                vehicles_per_minute = self.vehicles_per_hour / 60
-            
-            # 泊松分布决定这一分钟内到达的车辆数
-            arrivals = np.random.poisson(vehicles_per_minute)
-            for _ in range(arrivals):
-                # 随机生成车辆位置，但倾向于在道路和热点区域
-                if random.random() < 0.4:  # 40%的车辆靠近主要道路
-                    # 生成靠近主要道路的位置
-                    road_x = random.choice([PARK_WIDTH * 0.25, PARK_WIDTH * 0.5, PARK_WIDTH * 0.75])
-                    road_y = random.choice([PARK_HEIGHT * 0.25, PARK_HEIGHT * 0.5, PARK_HEIGHT * 0.75])
-                    # 在道路附近随机偏移
-                    position = (
-                        max(0, min(PARK_WIDTH, road_x + random.uniform(-100, 100))),
-                        max(0, min(PARK_HEIGHT, road_y + random.uniform(-100, 100)))
-                    )
-                else:
-                    # 完全随机位置
-                    position = (
-                        random.uniform(0, PARK_WIDTH),
-                        random.uniform(0, PARK_HEIGHT)
-                    )
-                
-                # 根据时段调整停留时长
-                if morning_peak_start <= minute < morning_peak_end:
-                    # 上班时间，停留时间较长
-                    stay_duration = random.randint(180, 480)  # 3-8小时
-                elif evening_peak_start <= minute < evening_peak_end:
-                    # 下班时间，停留时间中等
-                    stay_duration = random.randint(60, 240)  # 1-4小时
-                else:
-                    # 其他时间，停留时间分布更广
-                    stay_duration = random.randint(30, 360)  # 0.5-6小时
-                
-                departure_time = minute + stay_duration
-                
-                # 根据停留时长调整所需电量
-                if stay_duration > 240:  # 长时间停留
-                    initial_charge = random.uniform(5, 30)  # 可能电量更低
-                    required_charge = random.uniform(70, 95)  # 希望充得更满
-                else:  # 短时间停留
-                    initial_charge = random.uniform(15, 50)  # 初始电量一般较高
-                    required_charge = random.uniform(60, 85)  # 充电要求适中
-                
-                # 创建车辆对象
-                vehicle = Vehicle(
-                    vehicle_id, minute, position, initial_charge, 
-                    departure_time, required_charge
-                )
-                vehicle_id += 1
-                
-                # 添加车辆到达事件
-                heapq.heappush(self.events, (minute, "vehicle_arrival", vehicle))
+        morning = (minutes >= morning_peak_start) & (minutes < morning_peak_end)
+        evening = (minutes >= evening_peak_start) & (minutes < evening_peak_end)
+        night = (hours >= 23) | (hours < 6)
+        
+        # 每分钟的到达率：高峰时段提高1.5倍，深夜时段降低至1/3
+        lam = np.where(morning | evening, self.vehicles_per_hour / 40,
+                       np.where(night, self.vehicles_per_hour / 180, self.vehicles_per_hour / 60))
+        
+        # 一次性抽取每分钟到达的车辆数，并展开为每辆车的到达时间
+        counts = rng.poisson(lam)
+        arrival = np.repeat(minutes, counts)
+        n = len(arrival)
+        
+        # 随机生成车辆位置，40%的车辆靠近主要道路（在道路附近随机偏移），其余完全随机
+        road = np.array([0.25, 0.5, 0.75])
+        near_road = rng.random(n) < 0.4
+        road_x = np.clip(rng.choice(road * PARK_WIDTH, n) + rng.uniform(-100, 100, n), 0, PARK_WIDTH)
+        road_y = np.clip(rng.choice(road * PARK_HEIGHT, n) + rng.uniform(-100, 100, n), 0, PARK_HEIGHT)
+        pos_x = np.where(near_road, road_x, rng.uniform(0, PARK_WIDTH, n))
+        pos_y = np.where(near_road, road_y, rng.uniform(0, PARK_HEIGHT, n))
+        
+        # 根据时段调整停留时长：上班时间3-8小时，下班时间1-4小时，其他时间0.5-6小时
+        arr_morning = morning[arrival]
+        arr_evening = evening[arrival]
+        stay_low = np.where(arr_morning, 180, np.where(arr_evening, 60, 30))
+        stay_high = np.where(arr_morning, 480, np.where(arr_evening, 240, 360))
+        stay_duration = rng.integers(stay_low, stay_high, endpoint=True)
+        departure = arrival + stay_duration
+        
+        # 根据停留时长调整所需电量：长时间停留的车辆电量更低、希望充得更满
+        long_stay = stay_duration > 240
+        initial_charge = rng.uniform(np.where(long_stay, 5, 15), np.where(long_stay, 30, 50))
+        required_charge = rng.uniform(np.where(long_stay, 70, 60), np.where(long_stay, 95, 85))
+        
+        # 创建车辆对象，ID按到达顺序编号
+        generated = [
+            Vehicle(vehicle_id, minute, (x, y), init, dep, req)
+            for vehicle_id, (minute, x, y, init, dep, req) in enumerate(zip(
+                arrival.tolist(), pos_x.tolist(), pos_y.tolist(),
+                initial_charge.tolist(), departure.tolist(), required_charge.tolist()))
+        ]
+        
+        # 添加车辆到达事件
+        seq = self._seq
+        self.events.extend((vehicle.arrival_time, _EV_ARRIVE, next(seq), vehicle) for vehicle in generated)
+        
+        self.init_vehicle_arrays(generated)
+    
+    def init_vehicle_arrays(self, vehicles):
+        """为全部车辆分配列存储，并将车辆挂接上去"""
+        n = len(vehicles)
+        self.veh_pos = np.empty((n, 2), dtype=np.float32)
+        self.veh_status = np.empty(n, dtype=np.int8)
+        self.veh_charge = np.empty(n, dtype=np.float64)
+        self.veh_req_charge = np.empty(n, dtype=np.float64)
+        self.veh_arrival = np.empty(n, dtype=np.int32)
+        self.veh_departure = np.empty(n, dtype=np.int32)
+        for idx, vehicle in enumerate(vehicles):
+            vehicle.attach(self, idx)
+        
+        # 离开时间在生成时即已确定，预先排序后按时间顺序批量处理离开
+        self._all_vehicles = vehicles
+        self._dep_order = np.argsort(self.veh_departure, kind="stable")
+        self._dep_sorted = self.veh_departure[self._dep_order]
+        self._dep_ptr = 0
     
     def run(self):
         """运行模拟"""
         start_time = time.time()
         
-        while self.events and self.current_time < MAX_SIM_TIME:
-            # 获取下一个事件
-            event = heapq.heappop(self.events)
-            self.current_time = event[0]
-            
-            # 处理不同类型的事件
-            if event[1] == "vehicle_arrival":
-                self.handle_vehicle_arrival(event[2])
-            elif event[1] == "assign_tasks":
-                self.assign_tasks()
-                # 每2分钟执行一次任务分配，提高响应速度
-                heapq.heappush(self.events, (self.current_time + 2, "assign_tasks"))
-            elif event[1] == "update_status":
-                self.update_status()
-                # 每分钟更新一次状态
-                heapq.heappush(self.events, (self.current_time + 1, "update_status"))
-            elif event[1] == "update_priorities":
-                self.update_vehicle_priorities()
-                # 每5分钟更新一次优先级
-                heapq.heappush(self.events, (self.current_time + 5, "update_priorities"))
-            elif event[1] == "vehicle_departure":
-                self.handle_vehicle_departure(event[2])
-            elif event[1] == "task_completion":
-                self.handle_task_completion(event[2])
-            elif event[1] == "battery_charged":
-                self.handle_battery_charged(event[2])
+        while self.current_time < MAX_SIM_TIME:
+            self.step()
         
         simulation_time = time.time() - start_time
         self.log(f"模拟完成，耗时: {simulation_time:.2f}秒")
@@ -469,20 +827,62 @@ class ChargingSimulation:
         
         return self.stats
     
+    def step(self):
+        """推进一分钟：依次执行本分钟的周期任务、到期事件和车辆离开，然后时间前进1分钟"""
+        t = self.current_time
+        
+        # 周期任务由分钟数直接决定，不再经过事件队列
+        if t % ASSIGN_INTERVAL == 0:
+            # 每2分钟执行一次任务分配，提高响应速度
+            self.assign_tasks()
+        if t % PRIORITY_INTERVAL == 1:
+            # 每5分钟更新一次优先级
+            self.update_vehicle_priorities()
+        if t >= 1:
+            # 每分钟更新一次状态
+            self.update_status()
+        
+        pop = self.events.pop
+        event = pop(t)
+        while event is not None:
+            self.dispatch_event(event)
+            event = pop(t)
+        # 离开在同一时刻的其他事件之后处理
+        self.process_departures()
+        self.current_time += 1
+    
+    def step_batch(self, n_steps, until=None):
+        """连续推进n_steps分钟，到达until时提前停止，返回实际推进的分钟数"""
+        if until is None:
+            until = MAX_SIM_TIME
+        steps = 0
+        while steps < n_steps and self.current_time < until:
+            self.step()
+            steps += 1
+        return steps
+    
+    def schedule(self, time, event_type, data=None):
+        """添加事件"""
+        self.events.push((time, event_type, next(self._seq), data))
+    
+    def dispatch_event(self, event):
+        """处理单个事件，按事件类型查表调用处理函数"""
+        self.current_time = event[0]
+        self._handlers[event[1]](event[3])
+    
     def handle_vehicle_arrival(self, vehicle):
         """处理车辆到达事件"""
         self.vehicles.append(vehicle)
-        self.waiting_vehicles.append(vehicle)
+        self._waiting[vehicle.id] = vehicle
+        self._index_waiting(vehicle, True)
         # 计算初始优先级
         vehicle.update_priority(self.current_time)
         
         # 更新区域覆盖统计
         self.update_zone_coverage(vehicle.position)
         
-        self.log(f"{self.current_time}分钟: 车辆{vehicle.id}到达园区位置{vehicle.position}，初始电量{vehicle.initial_charge:.1f}kWh，预计离开时间{vehicle.departure_time}分钟")
-        
-        # 添加车辆离开事件
-        heapq.heappush(self.events, (vehicle.departure_time, "vehicle_departure", vehicle))
+        if self.verbose:
+            self.log(f"{self.current_time}分钟: 车辆{vehicle.id}到达园区位置{vehicle.position}，初始电量{vehicle.initial_charge:.1f}kWh，预计离开时间{vehicle.departure_time}分钟")
         
         # 立即尝试分配任务 - 对紧急车辆快速响应
         if vehicle.departure_time - self.current_time < 60:  # 如果车辆停留时间少于1小时
@@ -491,89 +891,93 @@ class ChargingSimulation:
     def assign_emergency_task(self, vehicle):
         """紧急任务分配 - 为停留时间短的车辆快速分配机器人"""
         # 获取空闲机器人
-        idle_robots = [r for r in self.robots 
-                      if r.status == "idle" 
-                      and r.battery 
-                      and r.battery.current_charge > 15]  # 确保有足够电量执行任务
+        idle_robots = self.idle_robots(min_charge=15)  # 确保有足够电量执行任务
         
         if not idle_robots:
             return False
             
-        # 计算到每个机器人的距离
-        robot_distances = [(r, r.distance_to(vehicle.position)) for r in idle_robots]
-        robot_distances.sort(key=lambda x: x[1])  # 按距离排序
-        
-        for robot, distance in robot_distances:
-            # 检查能否在截止时间前完成任务
-            travel_time = robot.time_to_reach(vehicle.position)
-            charge_need = vehicle.required_charge - vehicle.current_charge
-            charge_time = vehicle.needed_charge_time()
-            
-            if self.current_time + travel_time + charge_time > vehicle.departure_time:
-                # 来不及完成，尝试下一个机器人
-                continue
-                
-            # 检查电池是否足够
-            trip_to_vehicle = robot.battery_needed_for_trip(vehicle.position, False)
-            estimated_charging = charge_need * 0.5  # 估计充电消耗
-            trip_back = robot.battery_needed_for_trip(robot.find_nearest_charging_station(), False)
-            total_energy_needed = trip_to_vehicle + estimated_charging + trip_back
-            
-            if robot.battery.current_charge > total_energy_needed * 1.3:  # 30%的安全边际
-                # 分配任务
-                robot.status = "moving_to_vehicle"
-                robot.target_vehicle = vehicle
-                robot.task_start_time = self.current_time
-                vehicle.assigned_robot = robot
-                vehicle.status = "assigned"
-                
-                # 从等待列表中移除
-                if vehicle in self.waiting_vehicles:
-                    self.waiting_vehicles.remove(vehicle)
-                
-                self.log(f"{self.current_time}分钟: [紧急] 机器人{robot.id}分配到车辆{vehicle.id}（距离{distance:.1f}米，停留时间{vehicle.departure_time-self.current_time}分钟）")
-                return True
-        
-        return False
+        # 一次性计算每个机器人到车辆以及到最近充电站的距离
+        robot_pos = [r.position for r in idle_robots]
+        distances = pairwise_distances(robot_pos, [vehicle.position])[:, 0]
+        station_dists = pairwise_distances(robot_pos, CHARGING_STATIONS).min(axis=1)
+        speed = np.array([r.speed for r in idle_robots], dtype=np.float64)
+        consumption = np.array([r.battery_consumption_rate for r in idle_robots], dtype=np.float64)
+        battery = np.array([r.battery.current_charge for r in idle_robots], dtype=np.float64)
+        
+        # 检查能否在截止时间前完成任务
+        travel_time = distances / speed
+        feasible = self.current_time + travel_time + vehicle.needed_charge_time() <= vehicle.departure_time
+        # 检查电池是否足够：去程 + 估计充电消耗 + 返回最近充电站，30%的安全边际
+        estimated_charging = (vehicle.required_charge - vehicle.current_charge) * 0.5
+        total_energy_needed = travel_time * consumption + estimated_charging + station_dists / speed * consumption
+        feasible &= battery > total_energy_needed * 1.3
+        
+        # 在可行的机器人中选择最近的一个
+        order = np.argsort(distances, kind="stable")
+        order = order[feasible[order]]
+        if not len(order):
+            return False
+        i = int(order[0])
+        robot = idle_robots[i]
+        
+        # 分配任务
+        robot.status = MOVING
+        robot.target_vehicle = vehicle
+        robot.task_start_time = self.current_time
+        vehicle.assigned_robot = robot
+        vehicle.status = ASSIGNED
+        
+        if self.verbose:
+            self.log(f"{self.current_time}分钟: [紧急] 机器人{robot.id}分配到车辆{vehicle.id}（距离{distances[i]:.1f}米，停留时间{vehicle.departure_time-self.current_time}分钟）")
+        return True
+    
+    def process_departures(self):
+        """处理离开时间不晚于当前时刻的车辆，代替逐个车辆的离开事件"""
+        end = int(np.searchsorted(self._dep_sorted, self.current_time, side="right"))
+        if end > self._dep_ptr:
+            vehicles = self._all_vehicles
+            for idx in self._dep_order[self._dep_ptr:end].tolist():
+                self.handle_vehicle_departure(vehicles[idx])
+            self._dep_ptr = end
     
     def handle_vehicle_departure(self, vehicle):
         """处理车辆离开事件"""
-        if vehicle not in self.completed_vehicles and vehicle.status != "completed":
-            self.log(f"{self.current_time}分钟: 车辆{vehicle.id}离开园区，未完成充电任务，状态为{vehicle.status}")
-            vehicle.status = "failed"
+        if vehicle.status != DONE:
+            if self.verbose:
+                self.log(f"{self.current_time}分钟: 车辆{vehicle.id}离开园区，未完成充电任务，状态为{VEHICLE_STATUS_NAMES[vehicle.status]}")
+            vehicle.status = FAILED
             self.failed_vehicles.append(vehicle)
             self.stats["failed_count"] += 1
             
             # 如果车辆正在充电或被分配，释放其机器人
             if vehicle.assigned_robot and vehicle.assigned_robot.target_vehicle == vehicle:
                 robot = vehicle.assigned_robot
-                self.log(f"{self.current_time}分钟: 机器人{robot.id}取消为车辆{vehicle.id}的充电任务")
-                robot.status = "returning"
+                if self.verbose:
+                    self.log(f"{self.current_time}分钟: 机器人{robot.id}取消为车辆{vehicle.id}的充电任务")
+                robot.status = RETURNING
                 robot.target_vehicle = None
                 vehicle.assigned_robot = None
-            
-            # 从等待列表中移除
-            if vehicle in self.waiting_vehicles:
-                self.waiting_vehicles.remove(vehicle)
         else:
-            self.log(f"{self.current_time}分钟: 车辆{vehicle.id}离开园区，当前电量{vehicle.current_charge:.1f}kWh")
+            if self.verbose:
+                self.log(f"{self.current_time}分钟: 车辆{vehicle.id}离开园区，当前电量{vehicle.current_charge:.1f}kWh")
     
     def handle_task_completion(self, robot):
         """处理任务完成事件"""
         vehicle = robot.target_vehicle
         
-        if not vehicle or vehicle.status == "failed":
+        if not vehicle or vehicle.status == FAILED:
             # 车辆已经离开或处理完毕
-            robot.status = "returning"
+            robot.status = RETURNING
             robot.target_vehicle = None
             return
         
         if vehicle.current_charge >= vehicle.required_charge:
             # 充电完成
-            vehicle.status = "completed"
+            vehicle.status = DONE
             vehicle.charging_end_time = self.current_time
             self.completed_vehicles.append(vehicle)
             self.stats["completed_count"] += 1
+            self.stats["robot_completed_counts"][robot.id] += 1
             
             # 计算等待和充电时间
             if vehicle.charging_start_time is not None:
@@ -582,16 +986,18 @@ class ChargingSimulation:
                 self.stats["total_waiting_time"] += waiting_time
                 self.stats["total_charging_time"] += charging_time
             
-            self.log(f"{self.current_time}分钟: 机器人{robot.id}完成对车辆{vehicle.id}的充电任务，当前电量{vehicle.current_charge:.1f}kWh")
+            if self.verbose:
+                self.log(f"{self.current_time}分钟: 机器人{robot.id}完成对车辆{vehicle.id}的充电任务，当前电量{vehicle.current_charge:.1f}kWh")
         
-        robot.status = "returning"
+        robot.status = RETURNING
         robot.target_vehicle = None
         vehicle.assigned_robot = None
         
         # 检查机器人电池是否需要充电
         if robot.battery and robot.battery.current_charge < 10:
             # 低电量，返回最近的充电站
-            self.log(f"{self.current_time}分钟: 机器人{robot.id}电量低（{robot.battery.current_charge:.1f}kWh），需要充电")
+            if self.verbose:
+                self.log(f"{self.current_time}分钟: 机器人{robot.id}电量低（{robot.battery.current_charge:.1f}kWh），需要充电")
             # 找到最近的充电站
             nearest_station = robot.find_nearest_charging_station()
             robot.position = nearest_station  # 直接回到充电站
@@ -600,39 +1006,133 @@ class ChargingSimulation:
         """处理电池充电完成事件"""
         if battery.current_charge >= battery.max_capacity:
             battery.current_charge = battery.max_capacity
-            battery.status = "available"
-            self.log(f"{self.current_time}分钟: 电池{battery.id}充电完成，电量{battery.current_charge:.1f}kWh")
+            battery.status = BAT_AVAILABLE
+            self.release_battery(battery)
+            if self.verbose:
+                self.log(f"{self.current_time}分钟: 电池{battery.id}充电完成，电量{battery.current_charge:.1f}kWh")
+    
+    def release_battery(self, battery):
+        """将电池登记为所在充电站的可用电池"""
+        heapq.heappush(self._avail_by_station[battery.location], (battery.id, battery))
+    
+    def take_battery(self, station):
+        """取出充电站中ID最小的可用电池，没有则返回None
+        
+        电池只有充满后才会变为可用，因此可用电池都满足换电时的电量要求
+        """
+        available = self._avail_by_station.get(station)
+        if available:
+            return heapq.heappop(available)[1]
+        return None
     
     def update_zone_coverage(self, position):
         """更新区域覆盖统计"""
-        x, y = position
-        
-        # 确定位置所在区域
-        for zone_name, ((x1, y1), (x2, y2)) in self.zones.items():
-            if x1 <= x <= x2 and y1 <= y <= y2:
-                self.stats["area_coverage"][zone_name] += 1
-                break
+        self._zone_counts[zone_index(position[0], position[1])] += 1
+    
+    def idle_robots(self, min_charge=0):
+        """按ID顺序返回空闲且电池电量高于min_charge的机器人"""
+        robots = self.robots
+        return [robots[i] for i in sorted(self._idle_robot_ids)
+                if robots[i].battery and robots[i].battery.current_charge > min_charge]
+    
+    def _index_waiting(self, vehicle, add):
+        """在等待车辆的有序索引中加入或移除车辆"""
+        self._sched_version += 1
+        keys = ((vehicle.departure_time, vehicle.id),
+                (vehicle.current_charge - vehicle.required_charge, vehicle.id))
+        for index, key in zip((self._by_deadline, self._by_need), keys):
+            if add:
+                bisect.insort(index, key)
+            else:
+                del index[bisect.bisect_left(index, key)]
     
     def update_vehicle_priorities(self):
-        """更新所有等待车辆的优先级"""
-        for vehicle in self.waiting_vehicles:
-            vehicle.update_priority(self.current_time)
-        
-        # 重新排序等待队列
-        self.waiting_vehicles.sort(reverse=True)  # 优先级高的在前面
+        """按当前等待中的车辆重建优先级队列"""
+        waiting = list(self._waiting.values())
+        if waiting:
+            # 从列存储批量计算优先级
+            idx = np.fromiter((v._idx for v in waiting), dtype=np.intp, count=len(waiting))
+            time_left, waiting_time, need = self._compute_priority_features(idx)
+            priorities = self.vehicle_priorities(idx, (time_left, waiting_time, need))
+            for vehicle, priority in zip(waiting, priorities.tolist()):
+                vehicle.priority = priority
+            
+            # 重新排序等待队列，与按Vehicle.__lt__执行sort(reverse=True)的结果一致：
+            # 优先级数值升序，相同时按ID降序
+            order = np.lexsort((-idx, priorities))
+            waiting = [waiting[i] for i in order.tolist()]
+            # 特征按相同顺序保存，供分配策略直接使用
+            self._w_time_left = time_left[order]
+            self._w_waiting_time = waiting_time[order]
+            self._w_need = need[order]
+        else:
+            self._w_time_left = self._w_waiting_time = self._w_need = np.empty(0)
+        self.waiting_vehicles = waiting
+    
+    def _compute_priority_features(self, idx):
+        """批量计算指定车辆的剩余时间（至少1分钟）、已等待时间和充电需求"""
+        t = self.current_time
+        time_left = np.maximum(1, self.veh_departure[idx] - t)
+        waiting_time = t - self.veh_arrival[idx]
+        need = self.veh_req_charge[idx] - self.veh_charge[idx]
+        return time_left, waiting_time, need
+    
+    def vehicle_priorities(self, idx, features=None):
+        """按Vehicle.update_priority的公式批量计算指定车辆的优先级，features为已算好的特征"""
+        time_urgency, waiting_time, need = features or self._compute_priority_features(idx)
+        charge_needed = np.maximum(0, need)
+        # 不到30分钟就要离开的车辆获得额外优先级
+        urgency_factor = np.where(time_urgency < 30, 10, 1)
+        return (charge_needed / time_urgency) * urgency_factor + (waiting_time / 60)
+    
+    def move_robots(self, robots, targets, time_elapsed=1):
+        """批量将机器人向各自目标移动一段时间，行为与Robot.move_towards一致，返回是否到达的列表"""
+        if len(robots) < BATCH_MOVE_MIN:
+            return [robot.move_towards(target, time_elapsed) for robot, target in zip(robots, targets)]
+        
+        # 每行为(x, y, 目标x, 目标y, 速度)
+        data = np.array([(r.position[0], r.position[1], t[0], t[1], r.speed)
+                         for r, t in zip(robots, targets)], dtype=np.float64)
+        x, y, tx, ty, speed = data.T
+        dx = tx - x
+        dy = ty - y
+        distance = np.hypot(dx, dy)
+        move_distance = np.minimum(distance, speed * time_elapsed)
+        arrived = move_distance >= distance
+        # 未到达的机器人按比例前进
+        ratio = np.divide(move_distance, distance, out=np.zeros_like(distance), where=~arrived)
+        
+        result = arrived.tolist()
+        for robot, target, done, nx, ny in zip(robots, targets, result,
+                                               (x + dx * ratio).tolist(), (y + dy * ratio).tolist()):
+            if robot.position == target:
+                continue  # 已经在目标位置，不消耗电量
+            robot.position = target if done else (nx, ny)
+            # 消耗电池电量
+            if robot.battery:
+                robot.battery.current_charge -= robot.battery_consumption_rate * time_elapsed
+                robot.battery.location = robot.position
+        return result
     
     def update_status(self):
         """更新所有实体的状态"""
+        # 本分钟各机器人的充电效率波动（95%-105%），按机器人ID取用
+        efficiencies = self.rng.uniform(0.95, 1.05, size=len(self.robots)).tolist()
+        
+        # 需要移动的机器人先记录下来，循环结束后批量移动
+        movers = []
+        targets = []
+        reasons = []
+        
         # 更新机器人状态
         for robot in self.robots:
             if not robot.battery:
                 # 尝试获取一个可用电池
-                available_batteries = [b for b in self.batteries if b.status == "available" 
-                                      and b.location == robot.position]
-                if available_batteries:
-                    battery = available_batteries[0]
+                battery = self.take_battery(robot.position)
+                if battery:
                     robot.assign_battery(battery)
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}获得电池{battery.id}，电量{battery.current_charge:.1f}kWh")
+                    if self.verbose:
+                        self.log(f"{self.current_time}分钟: 机器人{robot.id}获得电池{battery.id}，电量{battery.current_charge:.1f}kWh")
                 continue
             
             # 检查电池是否需要更换
@@ -640,63 +1140,55 @@ class ChargingSimulation:
                 # 先检查当前位置是否为充电站
                 if robot.position in CHARGING_STATIONS:
                     old_battery = robot.battery
-                    old_battery.status = "charging"
+                    old_battery.status = BAT_CHARGING
                     old_battery.assigned_robot = None
                     old_battery.charge_start_time = self.current_time
                     old_battery.location = robot.position  # 确保电池位置是正确的充电站
                     robot.battery = None
                     
                     # 尝试获取一个充满电的电池
-                    available_batteries = [b for b in self.batteries if b.status == "available" 
-                                          and b.location == robot.position
-                                          and b.current_charge > 45]  # 电量超过75%
-                    if available_batteries:
-                        new_battery = available_batteries[0]
+                    new_battery = self.take_battery(robot.position)
+                    if new_battery:
                         robot.assign_battery(new_battery)
                         self.stats["battery_swaps"] += 1
-                        self.log(f"{self.current_time}分钟: 机器人{robot.id}更换电池，从{old_battery.id}（{old_battery.current_charge:.1f}kWh）到{new_battery.id}（{new_battery.current_charge:.1f}kWh）")
+                        if self.verbose:
+                            self.log(f"{self.current_time}分钟: 机器人{robot.id}更换电池，从{old_battery.id}（{old_battery.current_charge:.1f}kWh）到{new_battery.id}（{new_battery.current_charge:.1f}kWh）")
                     else:
-                        self.log(f"{self.current_time}分钟: 机器人{robot.id}等待可用电池")
-                        robot.status = "idle"
+                        if self.verbose:
+                            self.log(f"{self.current_time}分钟: 机器人{robot.id}等待可用电池")
+                        robot.status = IDLE
                 else:
                     # 返回最近的充电站更换电池
-                    nearest_station = robot.find_nearest_charging_station()
-                    robot.status = "returning"
+                    robot.status = RETURNING
                     robot.target_vehicle = None
                     # 直接设置目标为最近充电站
-                    arrived = robot.move_towards(nearest_station, 1)
-                    if arrived:
-                        self.log(f"{self.current_time}分钟: 机器人{robot.id}到达充电站准备更换电池")
-                    else:
-                        self.log(f"{self.current_time}分钟: 机器人{robot.id}电量低（{robot.battery.current_charge:.1f}kWh），正前往最近充电站")
+                    movers.append(robot)
+                    targets.append(robot.find_nearest_charging_station())
+                    reasons.append(_MOVE_LOW_BATTERY)
                 continue
             
             # 更新机器人行为
-            if robot.status == "idle":
+            if robot.status == IDLE:
                 # 空闲状态，消耗少量电量
                 if robot.battery:
                     robot.battery.current_charge -= robot.idle_consumption_rate
             
-            elif robot.status == "moving_to_vehicle":
-                if not robot.target_vehicle or robot.target_vehicle.status in ["completed", "failed"]:
+            elif robot.status == MOVING:
+                if not robot.target_vehicle or robot.target_vehicle.status >= DONE:
                     # 目标车辆已完成或失败，返回充电站
-                    robot.status = "returning"
+                    robot.status = RETURNING
                     robot.target_vehicle = None
                     continue
                 
                 # 移动到目标车辆
-                arrived = robot.move_towards(robot.target_vehicle.position, 1)
-                if arrived:
-                    # 到达目标车辆，开始充电
-                    robot.status = "charging_vehicle"
-                    robot.target_vehicle.status = "charging"
-                    robot.target_vehicle.charging_start_time = self.current_time
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}到达车辆{robot.target_vehicle.id}，开始充电")
+                movers.append(robot)
+                targets.append(robot.target_vehicle.position)
+                reasons.append(_MOVE_TO_VEHICLE)
             
-            elif robot.status == "charging_vehicle":
-                if not robot.target_vehicle or robot.target_vehicle.status in ["completed", "failed"]:
+            elif robot.status == CHARGING_V:
+                if not robot.target_vehicle or robot.target_vehicle.status >= DONE:
                     # 目标车辆已完成或失败，返回充电站
-                    robot.status = "returning"
+                    robot.status = RETURNING
                     robot.target_vehicle = None
                     continue
                     
@@ -704,67 +1196,84 @@ class ChargingSimulation:
                 
                 # 检查是否有足够的电池电量继续充电
                 if robot.battery.current_charge < 8:  # 电池电量过低
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}电池电量过低（{robot.battery.current_charge:.1f}kWh），停止为车辆{vehicle.id}充电并返回")
-                    robot.status = "returning"
-                    vehicle.status = "waiting"
-                    self.waiting_vehicles.append(vehicle)  # 把车辆放回等待队列
+                    if self.verbose:
+                        self.log(f"{self.current_time}分钟: 机器人{robot.id}电池电量过低（{robot.battery.current_charge:.1f}kWh），停止为车辆{vehicle.id}充电并返回")
+                    robot.status = RETURNING
+                    vehicle.status = WAIT  # 车辆重新回到等待队列
                     vehicle.assigned_robot = None
                     robot.target_vehicle = None
                     continue
                 
-                # 计算本次可以传输的电量
-                charge_speed = vehicle.charge_speed(vehicle.current_charge)
-                max_transfer = min(
-                    charge_speed,  # 基于车辆当前电量的充电速度
-                    robot.battery.current_charge - 8  # 保留8kWh以返回充电站
-                )
+                # 计算本次传输的电量，引入随机因素模拟实际充电效率波动
+                max_transfer, actual_transfer = _charge_step(
+                    vehicle.current_charge, robot.battery.current_charge, efficiencies[robot.id])
                 
                 if max_transfer <= 0:
                     # 无法继续充电
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}无法继续为车辆{vehicle.id}充电，返回充电站")
-                    robot.status = "returning"
-                    vehicle.status = "waiting"
-                    self.waiting_vehicles.append(vehicle)  # 把车辆放回等待队列
+                    if self.verbose:
+                        self.log(f"{self.current_time}分钟: 机器人{robot.id}无法继续为车辆{vehicle.id}充电，返回充电站")
+                    robot.status = RETURNING
+                    vehicle.status = WAIT  # 车辆重新回到等待队列
                     vehicle.assigned_robot = None
                     robot.target_vehicle = None
                     continue
                 
-                # 执行充电，引入随机因素模拟实际充电效率波动
-                efficiency = random.uniform(0.95, 1.05)  # 95%-105%的效率波动
-                actual_transfer = max_transfer * efficiency
+                # 执行充电
                 vehicle.current_charge += actual_transfer
                 robot.battery.current_charge -= max_transfer
                 
-                self.log(f"{self.current_time}分钟: 机器人{robot.id}为车辆{vehicle.id}充电{actual_transfer:.2f}kWh，"
-                       f"车辆当前电量{vehicle.current_charge:.1f}/{vehicle.required_charge}kWh，"
-                       f"机器人电池剩余{robot.battery.current_charge:.1f}kWh")
+                if self.verbose:
+                    self.log(f"{self.current_time}分钟: 机器人{robot.id}为车辆{vehicle.id}充电{actual_transfer:.2f}kWh，"
+                           f"车辆当前电量{vehicle.current_charge:.1f}/{vehicle.required_charge}kWh，"
+                           f"机器人电池剩余{robot.battery.current_charge:.1f}kWh")
                 
                 # 检查充电是否完成
                 if vehicle.current_charge >= vehicle.required_charge:
                     vehicle.charging_end_time = self.current_time
                     self.handle_task_completion(robot)
             
-            elif robot.status == "returning":
+            elif robot.status == RETURNING:
                 # 返回最近的充电站
-                nearest_station = robot.find_nearest_charging_station()
-                arrived = robot.move_towards(nearest_station, 1)
-                if arrived:
-                    robot.status = "idle"
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}返回充电站")
+                movers.append(robot)
+                targets.append(robot.find_nearest_charging_station())
+                reasons.append(_MOVE_RETURN)
+        
+        # 批量移动，再逐个处理移动结果
+        if movers:
+            arrived = self.move_robots(movers, targets)
+            for robot, reason, done in zip(movers, reasons, arrived):
+                if reason == _MOVE_TO_VEHICLE:
+                    if done:
+                        # 到达目标车辆，开始充电
+                        robot.status = CHARGING_V
+                        robot.target_vehicle.status = CHARGING
+                        robot.target_vehicle.charging_start_time = self.current_time
+                        if self.verbose:
+                            self.log(f"{self.current_time}分钟: 机器人{robot.id}到达车辆{robot.target_vehicle.id}，开始充电")
+                elif reason == _MOVE_RETURN:
+                    if done:
+                        robot.status = IDLE
+                        if self.verbose:
+                            self.log(f"{self.current_time}分钟: 机器人{robot.id}返回充电站")
+                elif done:
+                    if self.verbose:
+                        self.log(f"{self.current_time}分钟: 机器人{robot.id}到达充电站准备更换电池")
+                else:
+                    if self.verbose:
+                        self.log(f"{self.current_time}分钟: 机器人{robot.id}电量低（{robot.battery.current_charge:.1f}kWh），正前往最近充电站")
         
         # 更新电池状态
         for battery in self.batteries:
-            if battery.status == "charging" and battery.location in CHARGING_STATIONS:
+            if battery.status == BAT_CHARGING and battery.location in CHARGING_STATIONS:
                 was_charging = battery.charge(1)  # 充电1分钟
                 if was_charging and battery.current_charge >= battery.max_capacity * 0.95:  # 达到95%就视为充满
                     self.handle_battery_charged(battery)
     
     def assign_tasks(self):
         """智能分配任务给空闲的机器人"""
-        # 缓存检查 - 如果距离上次分配时间不足2分钟且没有新车辆加入，使用缓存
-        if (self.current_time - self.last_assignment_time < 2 and 
-            self.last_assignment_time > 0 and 
-            len(self.waiting_vehicles) == len(self.assignment_cache.get('waiting_vehicles', []))):
+        # 缓存检查 - 如果距离上次分配时间不足2分钟且等待车辆和空闲机器人都没有变化，跳过本次分配
+        if (self.current_time - self.last_assignment_time < 2 and
+                self._sched_version == self._last_sched_version):
             return
             
         # 更新所有等待车辆的优先级
@@ -777,14 +1286,14 @@ class ChargingSimulation:
             return
         
         # 获取所有空闲的机器人
-        idle_robots = [r for r in self.robots 
-                      if r.status == "idle" 
-                      and r.battery 
-                      and r.battery.current_charge > 15]  # 确保有足够电量执行任务
+        idle_robots = self.idle_robots(min_charge=15)  # 确保有足够电量执行任务
         
         if not idle_robots:
             return
         
+        self._refresh_trip_back(idle_robots)
+        self._refresh_soa(waiting_vehicles, idle_robots)
+        
         # 根据不同的调度策略分配任务
         if self.scheduling_strategy == "nearest_first":
             self.assign_nearest_first(waiting_vehicles, idle_robots)
@@ -797,313 +1306,226 @@ class ChargingSimulation:
         elif self.scheduling_strategy == "hybrid_strategy":
             self.assign_hybrid_strategy(waiting_vehicles, idle_robots)
         
+        # 策略只修改车辆状态，分配结束后一次性从等待列表中去掉已分配的车辆
+        self.waiting_vehicles = [v for v in waiting_vehicles if v.status == WAIT]
+        
         # 更新缓存
         self.last_assignment_time = self.current_time
-        self.assignment_cache = {
-            'waiting_vehicles': list(waiting_vehicles)
-        }
+        self._last_sched_version = self._sched_version
+    
+    def _refresh_trip_back(self, robots):
+        """分配过程中机器人不移动，预先计算每个机器人返回最近充电站所需的电量"""
+        self._trip_back = {r.id: r.battery_needed_for_trip(r.find_nearest_charging_station(), False)
+                           for r in robots}
+    
+    def _refresh_soa(self, waiting_vehicles, idle_robots):
+        """将本轮分配涉及的等待车辆和空闲机器人整理为数组，并计算机器人到车辆的距离矩阵；
+        waiting_vehicles须为刚由update_vehicle_priorities生成的列表，剩余时间等特征沿用其结果"""
+        idx = np.fromiter((v._idx for v in waiting_vehicles), dtype=np.intp, count=len(waiting_vehicles))
+        veh_pos = np.array([v.position for v in waiting_vehicles], dtype=np.float64).reshape(-1, 2)
+        self._w_x = veh_pos[:, 0]
+        self._w_y = veh_pos[:, 1]
+        self._w_charge_time = _needed_charge_time_vec(self.veh_charge[idx], self.veh_req_charge[idx])
+        self._w_dep = self.veh_departure[idx]
+        
+        robot_pos = np.array([r.position for r in idle_robots], dtype=np.float64).reshape(-1, 2)
+        self._r_x = robot_pos[:, 0]
+        self._r_y = robot_pos[:, 1]
+        self._r_speed = np.array([r.speed for r in idle_robots], dtype=np.float64)
+        self._r_bat = np.array([r.battery.current_charge if r.battery else 0 for r in idle_robots],
+                               dtype=np.float64)
+        
+        # 行为机器人，列为车辆；距离矩阵写入复用的缓冲区，下一轮分配时会被覆盖
+        shape = (len(idle_robots), len(waiting_vehicles))
+        dx = np.subtract(self._r_x[:, None], self._w_x[None, :], out=self._scratch_array("dx", shape))
+        dy = np.subtract(self._r_y[:, None], self._w_y[None, :], out=self._scratch_array("dy", shape))
+        self._dists = np.hypot(dx, dy, out=self._scratch_array("dists", shape))
+    
+    def _scratch_array(self, name, shape):
+        """取得指定形状的float64缓冲区视图，容量不足时按两倍扩容"""
+        size = shape[0] * shape[1]
+        buf = self._scratch.get(name)
+        if buf is None or buf.size < size:
+            buf = self._scratch[name] = np.empty(max(size, 2 * (buf.size if buf is not None else 0)))
+        return buf[:size].reshape(shape)
+    
+    def _feasible_pairs(self, idle_robots, safety_margin=1.3):
+        """机器人-车辆可行性矩阵：能在截止时间前完成，且电池在安全边际下足够往返和充电；
+        safety_margin可以是标量，也可以是每个机器人一个值的数组"""
+        shape = self._dists.shape
+        travel_time = np.divide(self._dists, self._r_speed[:, None], out=self._scratch_array("travel", shape))
+        # 完成时间 = 当前时间 + 路程时间 + 充电时间
+        finish = np.add(travel_time, self.current_time, out=self._scratch_array("tmp", shape))
+        finish += self._w_charge_time[None, :]
+        feasible = finish <= self._w_dep[None, :]
+        consumption = np.array([r.battery_consumption_rate for r in idle_robots])
+        trip_back = np.array([self._trip_back[r.id] for r in idle_robots])
+        # 所需电量 = 去程 + 估计充电消耗（充电需求的一半）+ 返回充电站
+        total_energy_needed = np.multiply(travel_time, consumption[:, None], out=finish)
+        total_energy_needed += self._w_need[None, :] * 0.5
+        total_energy_needed += trip_back[:, None]
+        total_energy_needed *= safety_margin[:, None] if np.ndim(safety_margin) else safety_margin
+        feasible &= self._r_bat[:, None] > total_energy_needed
+        return feasible
     
     def assign_nearest_first(self, waiting_vehicles, idle_robots):
         """最近任务优先策略"""
-        for robot in idle_robots:
-            if not waiting_vehicles:
+        # 只保留能在截止时间前完成且电量足够（30%的安全边际）的组合，其余距离视为无穷远
+        distances = np.where(self._feasible_pairs(idle_robots), self._dists, np.inf)
+        num_assigned = 0
+        
+        for i, robot in enumerate(idle_robots):
+            if num_assigned == len(waiting_vehicles):
                 break
-                
-            # 计算到每个等待车辆的距离
-            vehicle_distances = [(v, robot.distance_to(v.position)) for v in waiting_vehicles]
             
-            # 按距离排序
-            vehicle_distances.sort(key=lambda x: x[1])
+            # 只需要最近的可行车辆，取最小值即可，无需排序（相同距离取下标小的）
+            j = int(distances[i].argmin())
+            distance = distances[i, j]
+            if distance == np.inf:
+                continue
+            vehicle = waiting_vehicles[j]
+            # 分配任务
+            robot.status = MOVING
+            robot.target_vehicle = vehicle
+            robot.task_start_time = self.current_time
+            vehicle.assigned_robot = robot
+            vehicle.status = ASSIGNED
+            # 已分配的车辆不再参与后续机器人的选择
+            distances[:, j] = np.inf
+            num_assigned += 1
+            
+            if self.verbose:
+                self.log(f"{self.current_time}分钟: 机器人{robot.id}分配到车辆{vehicle.id}（距离{distance:.1f}米）")
+    
+    def _assign_in_order(self, waiting_vehicles, idle_robots, vehicle_order, describe):
+        """按给定的车辆顺序依次为每辆车分配最近的可行机器人；describe(车辆)返回日志中的说明"""
+        # 只保留能在截止时间前完成且电量足够（30%的安全边际）的组合，其余距离视为无穷远；
+        # 转置为行是车辆、列是机器人，使每辆车的候选距离连续存放
+        feasible = self._feasible_pairs(idle_robots)
+        distances = np.where(feasible, self._dists, np.inf).T.copy()
+        has_feasible = feasible.any(axis=0).tolist()
+        num_used = 0
+        
+        for j in vehicle_order:
+            if num_used == len(idle_robots):
+                break
+            if not has_feasible[j]:
+                continue
             
-            # 尝试分配最近的车辆
-            for vehicle, distance in vehicle_distances:
-                # 检查能否在截止时间前完成
-                travel_time = distance / robot.speed
-                charge_time = vehicle.needed_charge_time()
-                
-                if self.current_time + travel_time + charge_time > vehicle.departure_time:
-                    # 来不及完成，尝试下一个车辆
-                    continue
-                    
-                # 检查电池是否足够完成任务
-                trip_to_vehicle = robot.battery_needed_for_trip(vehicle.position, False)
-                estimated_charging = (vehicle.required_charge - vehicle.current_charge) * 0.5  # 估计充电消耗
-                trip_back = robot.battery_needed_for_trip(robot.find_nearest_charging_station(), False)
-                total_energy_needed = trip_to_vehicle + estimated_charging + trip_back
-                
-                if robot.battery.current_charge > total_energy_needed * 1.3:  # 30%的安全边际
-                    # 分配任务
-                    robot.status = "moving_to_vehicle"
-                    robot.target_vehicle = vehicle
-                    robot.task_start_time = self.current_time
-                    vehicle.assigned_robot = robot
-                    vehicle.status = "assigned"
-                    
-                    # 从等待列表中移除
-                    waiting_vehicles.remove(vehicle)
-                    
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}分配到车辆{vehicle.id}（距离{distance:.1f}米）")
-                    break
+            # 只需要最近的尚未分配且可行的机器人，取最小值即可，无需排序（相同距离取下标小的）
+            i = int(distances[j].argmin())
+            if distances[j, i] == np.inf:
+                continue
+            robot = idle_robots[i]
+            vehicle = waiting_vehicles[j]
+            # 分配任务
+            robot.status = MOVING
+            robot.target_vehicle = vehicle
+            robot.task_start_time = self.current_time
+            vehicle.assigned_robot = robot
+            vehicle.status = ASSIGNED
+            # 已分配的机器人不再参与后续车辆的选择
+            distances[:, i] = np.inf
+            num_used += 1
+            
+            if self.verbose:
+                self.log(f"{self.current_time}分钟: 机器人{robot.id}分配到车辆{vehicle.id}（{describe(vehicle)}）")
     
     def assign_max_charge_need_first(self, waiting_vehicles, idle_robots):
         """最大充电需求优先策略"""
-        # 按充电需求降序排序
-        charge_sorted_vehicles = sorted(waiting_vehicles, 
-                                      key=lambda v: v.required_charge - v.current_charge, 
-                                      reverse=True)
-        
-        for vehicle in charge_sorted_vehicles[:]:
-            if not idle_robots:
-                break
-                
-            # 找到最近的机器人
-            robot_distances = [(r, r.distance_to(vehicle.position)) for r in idle_robots]
-            robot_distances.sort(key=lambda x: x[1])
-            
-            for robot, distance in robot_distances:
-                # 检查能否在截止时间前完成
-                travel_time = distance / robot.speed
-                charge_need = vehicle.required_charge - vehicle.current_charge
-                charge_time = vehicle.needed_charge_time()
-                
-                if self.current_time + travel_time + charge_time > vehicle.departure_time:
-                    # 来不及完成，尝试下一个机器人
-                    continue
-                    
-                # 检查电池是否足够完成任务
-                trip_to_vehicle = robot.battery_needed_for_trip(vehicle.position, False)
-                estimated_charging = charge_need * 0.5  # 估计充电消耗
-                trip_back = robot.battery_needed_for_trip(robot.find_nearest_charging_station(), False)
-                total_energy_needed = trip_to_vehicle + estimated_charging + trip_back
-                
-                if robot.battery.current_charge > total_energy_needed * 1.3:  # 30%的安全边际
-                    # 分配任务
-                    robot.status = "moving_to_vehicle"
-                    robot.target_vehicle = vehicle
-                    robot.task_start_time = self.current_time
-                    vehicle.assigned_robot = robot
-                    vehicle.status = "assigned"
-                    
-                    # 从列表中移除
-                    waiting_vehicles.remove(vehicle)
-                    idle_robots.remove(robot)
-                    
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}分配到车辆{vehicle.id}（充电需求{charge_need:.1f}kWh）")
-                    break
+        # 按充电需求降序（相同时按ID）遍历
+        column = {v.id: j for j, v in enumerate(waiting_vehicles)}
+        self._assign_in_order(
+            waiting_vehicles, idle_robots, [column[vid] for _, vid in self._by_need],
+            lambda v: f"充电需求{v.required_charge - v.current_charge:.1f}kWh")
     
     def assign_earliest_deadline_first(self, waiting_vehicles, idle_robots):
         """最早截止时间优先策略"""
-        # 按离开时间排序
-        deadline_sorted_vehicles = sorted(waiting_vehicles, key=lambda v: v.departure_time)
-        
-        for vehicle in deadline_sorted_vehicles[:]:
-            if not idle_robots:
-                break
-                
-            # 找到最近的机器人
-            robot_distances = [(r, r.distance_to(vehicle.position)) for r in idle_robots]
-            robot_distances.sort(key=lambda x: x[1])
-            
-            for robot, distance in robot_distances:
-                # 检查能否在截止时间前完成
-                travel_time = distance / robot.speed
-                charge_need = vehicle.required_charge - vehicle.current_charge
-                charge_time = vehicle.needed_charge_time()
-                
-                if self.current_time + travel_time + charge_time > vehicle.departure_time:
-                    # 来不及完成，尝试下一个机器人
-                    continue
-                    
-                # 检查电池是否足够完成任务
-                trip_to_vehicle = robot.battery_needed_for_trip(vehicle.position, False)
-                estimated_charging = charge_need * 0.5  # 估计充电消耗
-                trip_back = robot.battery_needed_for_trip(robot.find_nearest_charging_station(), False)
-                total_energy_needed = trip_to_vehicle + estimated_charging + trip_back
-                
-                if robot.battery.current_charge > total_energy_needed * 1.3:  # 30%的安全边际
-                    # 分配任务
-                    robot.status = "moving_to_vehicle"
-                    robot.target_vehicle = vehicle
-                    robot.task_start_time = self.current_time
-                    vehicle.assigned_robot = robot
-                    vehicle.status = "assigned"
-                    
-                    # 从列表中移除
-                    waiting_vehicles.remove(vehicle)
-                    idle_robots.remove(robot)
-                    
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}分配到车辆{vehicle.id}（截止时间{vehicle.departure_time}分钟，剩余{vehicle.departure_time-self.current_time}分钟）")
-                    break
+        # 按离开时间（相同时按ID）遍历
+        column = {v.id: j for j, v in enumerate(waiting_vehicles)}
+        self._assign_in_order(
+            waiting_vehicles, idle_robots, [column[vid] for _, vid in self._by_deadline],
+            lambda v: f"截止时间{v.departure_time}分钟，剩余{v.departure_time-self.current_time}分钟")
     
     def assign_most_urgent_first(self, waiting_vehicles, idle_robots):
         """最紧急任务优先策略（考虑充电时间和截止时间）"""
-        # 使用更新后的优先级排序
-        urgent_vehicles = list(waiting_vehicles)  # 复制一份
-        urgent_vehicles.sort(reverse=True)  # 优先级高的排前面
-        
-        for vehicle in urgent_vehicles[:]:
-            if not idle_robots:
-                break
-                
-            # 找到最近的机器人
-            robot_distances = [(r, r.distance_to(vehicle.position)) for r in idle_robots]
-            robot_distances.sort(key=lambda x: x[1])
-            
-            for robot, distance in robot_distances:
-                travel_time = distance / robot.speed  # 到达车辆的时间
-                
-                # 检查能否在截止时间前完成任务
-                charge_need = vehicle.required_charge - vehicle.current_charge
-                charge_time = vehicle.needed_charge_time()
-                
-                if self.current_time + travel_time + charge_time > vehicle.departure_time:
-                    # 来不及完成，尝试下一个机器人
-                    continue
-                
-                # 检查电池是否足够完成任务
-                trip_to_vehicle = robot.battery_needed_for_trip(vehicle.position, False)
-                estimated_charging = charge_need * 0.5  # 估计充电消耗
-                trip_back = robot.battery_needed_for_trip(robot.find_nearest_charging_station(), False)
-                total_energy_needed = trip_to_vehicle + estimated_charging + trip_back
-                
-                if robot.battery.current_charge > total_energy_needed * 1.3:  # 30%的安全边际
-                    # 分配任务
-                    robot.status = "moving_to_vehicle"
-                    robot.target_vehicle = vehicle
-                    robot.task_start_time = self.current_time
-                    vehicle.assigned_robot = robot
-                    vehicle.status = "assigned"
-                    
-                    # 从列表中移除
-                    waiting_vehicles.remove(vehicle)
-                    idle_robots.remove(robot)
-                    
-                    self.log(f"{self.current_time}分钟: 机器人{robot.id}分配到车辆{vehicle.id}（优先级{vehicle.priority:.2f}）")
-                    break
+        # 等待列表已由update_vehicle_priorities排好序，与按Vehicle.__lt__执行sort(reverse=True)的结果相同
+        self._assign_in_order(waiting_vehicles, idle_robots, range(len(waiting_vehicles)),
+                              lambda v: f"优先级{v.priority:.2f}")
     
     def assign_hybrid_strategy(self, waiting_vehicles, idle_robots):
         """混合策略 - 综合考虑多种因素的智能调度"""
-        # 将机器人按电池电量排序，电量多的优先分配给远距离任务
-        idle_robots.sort(key=lambda r: r.battery.current_charge if r.battery else 0, reverse=True)
-        
-        # 计算所有等待车辆的综合得分
-        vehicle_scores = []
-        for vehicle in waiting_vehicles:
-            # 基础信息
-            charge_need = vehicle.required_charge - vehicle.current_charge
-            time_left = max(1, vehicle.departure_time - self.current_time)
-            waiting_time = self.current_time - vehicle.arrival_time
-            
-            # 计算服务价值（电量需求/剩余时间）
-            service_value = charge_need / time_left if time_left > 0 else float('inf')
-            
-            # 时间紧迫度因子，小于60分钟时指数增加
-            if time_left < 60:
-                urgency_factor = 5 * (60 / time_left)
-            else:
-                urgency_factor = 1
-                
-            # 等待时间补偿，避免某些车辆一直得不到服务
-            waiting_factor = min(3, waiting_time / 60)  # 每等待1小时，提高至多3倍优先级
-            
-            # 区域平衡因子 - 确保各区域均匀获得服务
-            x, y = vehicle.position
-            area_balance = 1.0  # 默认值
-            
-            # 计算车辆所在区域
-            for zone_name, ((x1, y1), (x2, y2)) in self.zones.items():
-                if x1 <= x <= x2 and y1 <= y <= y2:
-                    # 获取该区域当前的服务次数
-                    zone_service_count = self.stats["area_coverage"].get(zone_name, 0)
-                    # 服务次数较少的区域获得优先级提升
-                    total_services = sum(self.stats["area_coverage"].values()) or 1
-                    expected_ratio = 1 / len(self.zones)
-                    actual_ratio = zone_service_count / total_services
-                    
-                    if actual_ratio < expected_ratio * 0.8:  # 低于平均的80%
-                        area_balance = 1.5  # 提高优先级
-                    break
-            
-            # 计算综合得分，考虑多种因素
-            score = service_value * urgency_factor * waiting_factor * area_balance
-            
-            vehicle_scores.append((vehicle, score))
         
-        # 按得分降序排序
-        vehicle_scores.sort(key=lambda x: x[1], reverse=True)
+        # 区域平衡：服务次数低于平均80%的区域获得1.5倍优先级提升
+        zone_counts = np.array(self._zone_counts)
+        total_services = zone_counts.sum() or 1
+        expected_ratio = 1 / len(ZONE_NAMES)
+        zone_factor = np.where(zone_counts / total_services < expected_ratio * 0.8, 1.5, 1.0)
         
-        # 为每个机器人分配最适合的车辆
-        for robot in idle_robots:
-            if not vehicle_scores:
-                break
-                
-            best_vehicle = None
-            best_score = -1
-            
-            for vehicle, base_score in vehicle_scores:
-                # 检查这个机器人是否能够为该车辆提供服务
-                distance = robot.distance_to(vehicle.position)
-                travel_time = distance / robot.speed
-                
-                # 计算充电需要的时间
-                charge_need = vehicle.required_charge - vehicle.current_charge
-                charge_time = vehicle.needed_charge_time()
-                
-                # 检查时间约束
-                if self.current_time + travel_time + charge_time > vehicle.departure_time:
-                    continue  # 无法在截止时间前完成
-                
-                # 检查电池约束
-                trip_to_vehicle = robot.battery_needed_for_trip(vehicle.position, False)
-                estimated_charging = charge_need * 0.5  # 估计充电消耗
-                trip_back = robot.battery_needed_for_trip(robot.find_nearest_charging_station(), False)
-                total_energy_needed = trip_to_vehicle + estimated_charging + trip_back
-                
-                # 电池安全边际
-                safety_margin = 1.5 - (robot.battery.current_charge / 60)  # 电量越低，安全边际越高
-                safety_margin = max(1.2, min(1.5, safety_margin))  # 安全边际在1.2-1.5之间
-                
-                if robot.battery.current_charge <= total_energy_needed * safety_margin:
-                    continue  # 电池电量不足
-                
-                # 距离惩罚因子 - 减少无谓的长距离移动
-                distance_penalty = 1 - min(0.4, distance / 1000)  # 最多降低40%优先级
-                
-                # 计算机器人与车辆的匹配度
-                match_score = base_score * distance_penalty
-                
-                if match_score > best_score:
-                    best_score = match_score
-                    best_vehicle = vehicle
-            
-            # 分配最佳车辆给当前机器人
-            if best_vehicle:
-                # 分配任务
-                robot.status = "moving_to_vehicle"
-                robot.target_vehicle = best_vehicle
-                robot.task_start_time = self.current_time
-                best_vehicle.assigned_robot = robot
-                best_vehicle.status = "assigned"
-                
-                # 记录最后分配时间
-                robot.last_assigned_time = self.current_time
-                
-                # 从列表中移除
-                waiting_vehicles.remove(best_vehicle)
-                vehicle_scores = [(v, s) for v, s in vehicle_scores if v != best_vehicle]
-                
-                # 计算最近充电站
-                nearest_station = robot.find_nearest_charging_station()
-                distance_to_station = robot.distance_to(nearest_station)
-                
+        # 计算所有等待车辆的综合得分
+        time_left = self._w_time_left
+        waiting_time = self._w_waiting_time
+        # 服务价值（电量需求/剩余时间）
+        service_value = self._w_need / time_left
+        # 时间紧迫度因子，小于60分钟时指数增加
+        urgency_factor = np.where(time_left < 60, 5 * (60 / time_left), 1)
+        # 等待时间补偿，避免某些车辆一直得不到服务：每等待1小时，提高至多3倍优先级
+        waiting_factor = np.minimum(3, waiting_time / 60)
+        # 区域平衡因子 - 确保各区域均匀获得服务，按车辆所在区域查表
+        area_balance = zone_factor[zone_index(self._w_x, self._w_y)]
+        scores = service_value * urgency_factor * waiting_factor * area_balance
+        
+        # 机器人与车辆的匹配度：距离惩罚因子减少无谓的长距离移动，最多降低40%优先级
+        dists = self._dists
+        match_scores = scores[None, :] * (1 - np.minimum(0.4, dists / 1000))
+        
+        # 可行性：电量越低，安全边际越高，安全边际在1.2-1.5之间
+        feasible = self._feasible_pairs(idle_robots, np.clip(1.5 - self._r_bat / 60, 1.2, 1.5))
+        
+        # 电量多的机器人优先分配给远距离任务
+        robot_order = np.argsort(-self._r_bat, kind="stable").tolist()
+        
+        if linear_sum_assignment is not None:
+            # 把分配看作带权二分匹配：不可行的组合代价极大，先保证匹配数量最多，再使总匹配度最高
+            cost = np.where(feasible, -match_scores, 1e12)
+            rows, cols = linear_sum_assignment(cost)
+            chosen = {r: c for r, c in zip(rows.tolist(), cols.tolist()) if feasible[r, c]}
+            pairs = [(i, chosen[i]) for i in robot_order if i in chosen]
+        else:
+            # 按得分降序依次为每个机器人选择匹配度最高的可行车辆
+            vehicle_order = np.argsort(-scores, kind="stable")
+            match_sorted = np.where(feasible[:, vehicle_order], match_scores[:, vehicle_order], -np.inf)
+            pairs = []
+            for i in robot_order:
+                k = int(np.argmax(match_sorted[i]))
+                if match_sorted[i, k] > -1:
+                    pairs.append((i, int(vehicle_order[k])))
+                    match_sorted[:, k] = -np.inf
+        
+        for i, j in pairs:
+            robot = idle_robots[i]
+            best_vehicle = waiting_vehicles[j]
+            
+            # 分配任务
+            robot.status = MOVING
+            robot.target_vehicle = best_vehicle
+            robot.task_start_time = self.current_time
+            best_vehicle.assigned_robot = robot
+            best_vehicle.status = ASSIGNED
+            
+            # 记录最后分配时间
+            robot.last_assigned_time = self.current_time
+            
+            if self.verbose:
                 self.log(f"{self.current_time}分钟: [混合策略] 机器人{robot.id}分配到车辆{best_vehicle.id}"
-                       f"（得分{best_score:.2f}，距离{robot.distance_to(best_vehicle.position):.1f}米，"
+                       f"（得分{match_scores[i, j]:.2f}，距离{dists[i, j]:.1f}米，"
                        f"充电需求{best_vehicle.required_charge-best_vehicle.current_charge:.1f}kWh，"
                        f"剩余时间{best_vehicle.departure_time-self.current_time}分钟）")
     
     def log(self, message):
         """记录事件日志"""
-        self.logs.append(message)
+        if self.verbose:
+            self.logs.append(message)
     
     def calculate_final_stats(self):
         """计算最终统计信息"""
@@ -1121,25 +1543,96 @@ class ChargingSimulation:
             self.stats["avg_charging_time"] = 0
         
         # 计算机器人利用率
-        for robot in self.robots:
-            # 简单估计：完成任务数量与总时间的比例
-            completed_tasks = sum(1 for v in self.completed_vehicles if v.assigned_robot == robot)
-            if self.current_time > 0:
-                self.stats["robot_utilization"][robot.id] = completed_tasks / self.current_time * 100 * 10  # 调整系数
+        # 完成任务时会清空vehicle.assigned_robot，因此使用完成时累计的计数
+        completed_counts = self.stats["robot_completed_counts"]
+        utilization = self.stats["robot_utilization"]
+        if self.current_time > 0:
+            for robot in self.robots:
+                # 简单估计：完成任务数量与总时间的比例
+                utilization[robot.id] = completed_counts[robot.id] / self.current_time * 100 * 10  # 调整系数
         
-        self.stats["avg_robot_utilization"] = sum(self.stats["robot_utilization"].values()) / len(self.robots) if self.robots else 0
+        num_robots = len(self.robots)
+        self.stats["avg_robot_utilization"] = sum(utilization.values()) / num_robots if num_robots else 0
+        
+        self.stats["area_coverage"] = defaultdict(int, zip(ZONE_NAMES, self._zone_counts))
         
 
 # 基于强化学习的调度类
+class QTable:
+    """稀疏Q表：状态编码为整数，每个状态一行
+    
+    每行保存动作（车辆ID）到列下标的映射和一个可增长的NumPy值数组，
+    取一行的最大值或一组动作的Q值都直接在数组上完成。只有写入过Q值的状态才有对应的行。
+    """
+    __slots__ = ("_rows",)
+    
+    def __init__(self):
+        self._rows = {}  # 状态编码 -> (动作 -> 列下标, 值数组)
+    
+    def __contains__(self, state):
+        return state in self._rows
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def action_values(self, state, actions):
+        """返回actions中在该状态下有Q值的动作下标，以及对应的Q值数组"""
+        cols, values = self._rows[state]
+        present = [k for k, a in enumerate(actions) if a in cols]
+        return present, values[[cols[actions[k]] for k in present]]
+    
+    def max_value(self, state, default=0):
+        """状态下所有动作的最大Q值，状态不存在时返回default"""
+        row = self._rows.get(state)
+        if row is None:
+            return default
+        cols, values = row
+        return values[:len(cols)].max()
+    
+    def slot(self, state, action):
+        """返回动作在该状态行中的列下标，动作不存在时以0初始化"""
+        row = self._rows.get(state)
+        if row is None:
+            row = self._rows[state] = ({}, np.zeros(8))
+        cols, values = row
+        col = cols.get(action)
+        if col is None:
+            col = cols[action] = len(cols)
+            if col == len(values):
+                # 扩容会替换值数组，因此调用方应在写入前再通过values()取数组
+                self._rows[state] = (cols, np.concatenate((values, np.zeros(len(values)))))
+        return col
+    
+    def values(self, state):
+        """状态行的值数组（可能含有未使用的尾部空间）"""
+        return self._rows[state][1]
+
+
+# RL状态离散化：电量级别分界（kWh）与每小时对应的时段（0早上/1下午/2晚上/3深夜）
+_BATTERY_LEVEL_BINS = (10, 20, 30, 45)
+_HOUR_PERIOD = tuple(0 if 6 <= h < 12 else 1 if 12 <= h < 18 else 2 if 18 <= h < 23 else 3
+                     for h in range(24))
+
+
 class RLRobotScheduler:
     """使用强化学习进行机器人调度"""
     
     def __init__(self, sim):
         self.sim = sim
-        self.q_table = {}  # 状态-动作值函数
+        self.q_table = QTable()  # 状态-动作值函数
         self.alpha = 0.2  # 学习率 - 提高以更快适应环境
         self.gamma = 0.8  # 折扣因子 - 降低以关注更近期奖励
         self.epsilon = 0.15  # 探索率 - 提高以增加探索
+        self._replay = []  # 本轮分配中待应用的转移(状态, 动作, 奖励, 下一状态)
+        # 探索用的随机数来自模拟种子派生的独立生成器，reset后继续原序列，不会重复上一回合的探索
+        self.rng = np.random.default_rng(sim._ss.spawn(1)[0])
+        self._uniforms = []  # 批量预取的[0, 1)均匀随机数
+        
+    def _uniform(self):
+        """取一个[0, 1)均匀随机数，每次批量生成1024个以减少调用开销"""
+        if not self._uniforms:
+            self._uniforms = self.rng.random(1024).tolist()
+        return self._uniforms.pop()
         
     def get_state(self, robot, vehicles):
         """获取当前状态表示 - 改进的状态表示，增加信息量"""
@@ -1147,30 +1640,26 @@ class RLRobotScheduler:
         robot_pos_x = int(robot.position[0] / 200)
         robot_pos_y = int(robot.position[1] / 200)
         
-        # 电池电量级别：低、中低、中、中高、高
+        # 电池电量级别：无电池、低、中低、中、中高、高
         if not robot.battery:
             battery_level = 0
-        elif robot.battery.current_charge < 10:
-            battery_level = 1
-        elif robot.battery.current_charge < 20:
-            battery_level = 2
-        elif robot.battery.current_charge < 30:
-            battery_level = 3
-        elif robot.battery.current_charge < 45:
-            battery_level = 4
         else:
-            battery_level = 5
+            battery_level = bisect.bisect_right(_BATTERY_LEVEL_BINS, robot.battery.current_charge) + 1
         
         # 车辆分布情况 - 周围的等待车辆数量和紧急程度
         nearby_vehicles = 0
         urgent_vehicles = 0
+        # 循环内使用局部变量，避免每辆车重复查找属性
+        hypot = math.hypot
+        rx, ry = robot.position
+        urgent_before = self.sim.current_time + 30
         for v in vehicles:
-            if v.status == "waiting":
-                dist = robot.distance_to(v.position)
-                if dist < 300:
+            if v.status == WAIT:
+                vx, vy = v.position
+                if hypot(rx - vx, ry - vy) < 300:
                     nearby_vehicles += 1
                     # 检查是否是紧急车辆（剩余时间少于30分钟）
-                    if v.departure_time - self.sim.current_time < 30:
+                    if v.departure_time < urgent_before:
                         urgent_vehicles += 1
         
         # 将数量范围限制，避免状态空间爆炸
@@ -1180,18 +1669,11 @@ class RLRobotScheduler:
             urgent_vehicles = 3
         
         # 获取当前时段 - 早上/下午/晚上/深夜，可能影响策略
-        hour = (self.sim.current_time // 60) % 24
-        if 6 <= hour < 12:
-            time_period = 0  # 早上
-        elif 12 <= hour < 18:
-            time_period = 1  # 下午
-        elif 18 <= hour < 23:
-            time_period = 2  # 晚上
-        else:
-            time_period = 3  # 深夜
+        time_period = _HOUR_PERIOD[int(self.sim.current_time // 60) % 24]
         
-        # 返回状态元组 - 包含更丰富的环境信息
-        return (robot_pos_x, robot_pos_y, battery_level, nearby_vehicles, urgent_vehicles, time_period)
+        # 将(位置x, 位置y, 电量级别, 附近车辆数, 紧急车辆数, 时段)编码为整数作为状态
+        return ((((robot_pos_x * 6 + robot_pos_y) * 6 + battery_level) * 9
+                 + nearby_vehicles) * 4 + urgent_vehicles) * 4 + time_period
     
     def get_action(self, state, waiting_vehicles):
         """根据ε-贪婪策略选择动作 - 改进的探索策略"""
@@ -1199,7 +1681,7 @@ class RLRobotScheduler:
             return None
         
         # 随机探索
-        if random.random() < self.epsilon:
+        if self._uniform() < self.epsilon:
             # 加权随机选择，倾向于选择有紧急性的车辆
             weights = []
             for vehicle in waiting_vehicles:
@@ -1216,131 +1698,67 @@ class RLRobotScheduler:
                     
                 weights.append(weight)
             
-            # 根据权重随机选择
-            return random.choices(waiting_vehicles, weights=weights, k=1)[0]
+            # 根据权重随机选择：按累积权重取第一个超过u的下标
+            cum_weights = list(itertools.accumulate(weights))
+            return waiting_vehicles[bisect.bisect(cum_weights, self._uniform() * cum_weights[-1])]
         
         # 利用已有经验
-        elif state in self.q_table and self.q_table[state]:
-            # 获取当前状态下所有动作的Q值
-            q_values = self.q_table[state]
-            available_vehicles = {}
-            
-            for vehicle in waiting_vehicles:
-                if str(vehicle.id) in q_values:
-                    available_vehicles[vehicle.id] = q_values[str(vehicle.id)]
+        elif state in self.q_table:
+            # 获取当前状态下各等待车辆的Q值
+            present, q_values = self.q_table.action_values(state, [v.id for v in waiting_vehicles])
             
             # 如果没有可用的车辆Q值，则随机选择
-            if not available_vehicles:
-                return random.choice(waiting_vehicles)
+            if not present:
+                return waiting_vehicles[int(self._uniform() * len(waiting_vehicles))]
             
             # 使用Softmax选择，而非简单的最大值
-            # 这样高Q值的动作有更高概率被选中，但低Q值动作仍有机会
-            vehicle_ids = list(available_vehicles.keys())
-            q_list = [available_vehicles[vid] for vid in vehicle_ids]
-            
-            # 计算Softmax概率
-            max_q = max(q_list)
-            exp_q = [np.exp((q - max_q) * 2) for q in q_list]  # 乘以2使得差异更明显
-            sum_exp_q = sum(exp_q)
-            probabilities = [eq / sum_exp_q for eq in exp_q]
-            
-            # 按概率选择
-            selected_id = np.random.choice(vehicle_ids, p=probabilities)
-            
-            # 找到对应的车辆对象
-            selected_vehicle = next((v for v in waiting_vehicles if v.id == selected_id), None)
-            
-            return selected_vehicle or random.choice(waiting_vehicles)
+            # 这样高Q值的动作有更高概率被选中，但低Q值动作仍有机会；温度系数2使得差异更明显
+            k = _softmax_sample(q_values, self._uniform(), 2.0)
+            return waiting_vehicles[present[k]]
         else:
             # 新状态，随机选择
-            return random.choice(waiting_vehicles)
+            return waiting_vehicles[int(self._uniform() * len(waiting_vehicles))]
     
     def update_q_table(self, state, action, reward, next_state):
-        """更新Q表 - 使用双Q学习算法以减少过估计"""
-        if state not in self.q_table:
-            self.q_table[state] = {}
-        
-        action_id = str(action.id)
-        if action_id not in self.q_table[state]:
-            self.q_table[state][action_id] = 0
+        """记录一次转移，在本轮分配结束时由flush_q_updates统一更新Q表"""
+        self._replay.append((state, action.id, reward, next_state))
+    
+    def flush_q_updates(self):
+        """批量应用本轮记录的转移：所有更新都以本轮开始时的Q值为基准"""
+        replay = self._replay
+        if not replay:
+            return
+        self._replay = []
+        q_table = self.q_table
         
-        # 计算下一状态的最大Q值
-        max_next_q = 0
-        if next_state in self.q_table and self.q_table[next_state]:
-            max_next_q = max(self.q_table[next_state].values())
+        cols = [q_table.slot(state, action) for state, action, _, _ in replay]
+        rewards = np.array([reward for _, _, reward, _ in replay], dtype=np.float64)
+        # 下一状态的最大Q值
+        max_next_q = np.array([q_table.max_value(next_state) for _, _, _, next_state in replay],
+                              dtype=np.float64)
+        old_values = np.array([q_table.values(state)[col] for (state, _, _, _), col in zip(replay, cols)])
         
-        # Q-learning更新公式
-        old_value = self.q_table[state][action_id]
-        self.q_table[state][action_id] = old_value + self.alpha * (reward + self.gamma * max_next_q - old_value)
+        # Q-learning更新公式；同一状态-动作出现多次时增量累加（与np.add.at相同）
+        deltas = self.alpha * (rewards + self.gamma * max_next_q - old_values)
+        for (state, _, _, _), col, delta in zip(replay, cols, deltas.tolist()):
+            q_table.values(state)[col] += delta
     
     def calculate_reward(self, robot, vehicle, current_time):
-        """计算选择该车辆的奖励 - 更细致的奖励机制"""
-        base_reward = 0
-        
-        # 1. 任务完成情况奖励
-        if vehicle.status == "completed":
-            completion_reward = 20  # 基础完成奖励
-            
-            # 根据充电量给予额外奖励
-            charge_added = vehicle.current_charge - vehicle.initial_charge
-            charge_reward = charge_added * 0.2  # 每增加1kWh奖励0.2
-            
-            # 时间效率奖励
-            if vehicle.charging_end_time is not None:
-                charge_time = vehicle.charging_end_time - vehicle.charging_start_time
-                time_efficiency = 10 - min(9, charge_time / 30)  # 充电时间越短奖励越高
-                time_efficiency = max(1, time_efficiency)  # 最低奖励为1
-            else:
-                time_efficiency = 1
-                
-            base_reward = completion_reward + charge_reward + time_efficiency
-            
-        elif vehicle.status == "failed":
-            # 任务失败惩罚
-            base_reward = -15
-            
+        """计算选择该车辆的奖励 - 更细致的奖励机制，由_reward_kernel完成数值计算"""
+        status = vehicle.status
+        if status == DONE and vehicle.charging_end_time is not None:
+            charge_time = float(vehicle.charging_end_time - vehicle.charging_start_time)
         else:
-            # 进行中的任务给予中性评价
-            base_reward = 0
-        
-        # 2. 考虑时间紧迫性
-        time_left = vehicle.departure_time - current_time
+            charge_time = -1.0
         charge_needed = vehicle.required_charge - vehicle.current_charge
-        
-        # 紧急性奖励 - 成功处理紧急车辆获得更高奖励
-        if time_left < 30 and vehicle.status == "completed":
-            urgency_reward = 10  # 处理非常紧急的车辆
-        elif time_left < 60 and vehicle.status == "completed":
-            urgency_reward = 5   # 处理紧急的车辆
-        else:
-            urgency_reward = 0
-            
-        # 3. 距离惩罚
-        distance = robot.distance_to(vehicle.position)
-        distance_penalty = min(10, distance / 100)  # 最多-10的惩罚
-        
-        # 4. 电池管理奖励
         battery_level = robot.battery.current_charge if robot.battery else 0
         energy_needed = robot.battery_needed_for_trip(vehicle.position, True) + charge_needed * 0.5
-        
-        if battery_level < energy_needed:
-            energy_penalty = -8  # 电量不足的风险惩罚
-        elif battery_level < energy_needed * 1.3:
-            energy_penalty = -3  # 电量略显不足
-        else:
-            energy_penalty = 0   # 电量充足
-        
-        # 5. 等待时间奖励 - 为长时间等待的车辆提供服务
-        waiting_time = current_time - vehicle.arrival_time
-        if waiting_time > 60 and vehicle.status == "completed":
-            waiting_reward = 5  # 成功为长时间等待的车辆提供服务
-        else:
-            waiting_reward = 0
-            
-        # 综合奖励计算
-        total_reward = base_reward + urgency_reward - distance_penalty + energy_penalty + waiting_reward
-        
-        return total_reward
+        return _reward_kernel(status == DONE, status == FAILED,
+                              float(vehicle.current_charge - vehicle.initial_charge), charge_time,
+                              float(vehicle.departure_time - current_time),
+                              float(robot.distance_to(vehicle.position)),
+                              float(battery_level), float(energy_needed),
+                              float(current_time - vehicle.arrival_time))
 
     def assign_rl_tasks(self, waiting_vehicles, idle_robots):
         """使用强化学习分配任务 - 更智能的分配策略"""
@@ -1375,47 +1793,57 @@ class RLRobotScheduler:
             trip_to_vehicle = robot.battery_needed_for_trip(vehicle.position, False)
             charge_need = vehicle.required_charge - vehicle.current_charge
             estimated_charging = charge_need * 0.5  # 估计充电消耗
-            trip_back = robot.battery_needed_for_trip(robot.find_nearest_charging_station(), False)
+            trip_back = self.sim._trip_back[robot.id]
             total_energy_needed = trip_to_vehicle + estimated_charging + trip_back
             
             if robot.battery and robot.battery.current_charge > total_energy_needed * 1.3:  # 30%的安全边际
                 # 分配任务
-                robot.status = "moving_to_vehicle"
+                robot.status = MOVING
                 robot.target_vehicle = vehicle
                 vehicle.assigned_robot = robot
-                vehicle.status = "assigned"
+                vehicle.status = ASSIGNED
                 
                 # 计算奖励
                 reward = self.calculate_reward(robot, vehicle, self.sim.current_time)
                 
-                # 获取新状态
-                next_state = self.get_state(robot, [v for v in waiting_vehicles if v != vehicle])
+                # 获取新状态，剩余车辆列表同时作为后续机器人的候选
+                waiting_vehicles = [v for v in waiting_vehicles if v is not vehicle]
+                next_state = self.get_state(robot, waiting_vehicles)
                 
                 # 更新Q表
                 self.update_q_table(state, vehicle, reward, next_state)
                 
-                # 从等待列表中移除
-                waiting_vehicles.remove(vehicle)
-                
-                self.sim.log(f"{self.sim.current_time}分钟: [RL] 机器人{robot.id}分配到车辆{vehicle.id}，预期奖励{reward:.2f}")
+                if self.sim.verbose:
+                    self.sim.log(f"{self.sim.current_time}分钟: [RL] 机器人{robot.id}分配到车辆{vehicle.id}，预期奖励{reward:.2f}")
             else:
                 # 电量不足，记录这次失败的选择
                 reward = -8  # 更大的负奖励，因为这种错误是可以避免的
                 next_state = state  # 状态不变
                 self.update_q_table(state, vehicle, reward, next_state)
+        
+        self.flush_q_updates()
 
 
 class RLChargingSimulation(ChargingSimulation):
     """使用强化学习的充电模拟类 - 改进版"""
     
-    def __init__(self, scale="小规模"):
-        super().__init__(scale=scale, scheduling_strategy="rl")
+    def __init__(self, scale="小规模", seed=None, verbose=True):
+        super().__init__(scale=scale, scheduling_strategy="rl", seed=seed, verbose=verbose)
         self.rl_scheduler = RLRobotScheduler(self)
         
         # 强化学习专用的参数
-        self.episode_rewards = []
+        # 最近5个周期的奖励及其和，用于输出滑动平均
+        self._recent_rewards = deque(maxlen=5)
+        self._recent_sum = 0.0
         self.current_episode_reward = 0
         self.training_episodes = 0  # 追踪学习进度
+        # 本周期内完成充电的(充电时间, 开始充电时的剩余时间)，周期结束时批量计算奖励
+        self._completion_times = []
+        self._completion_left = []
+        # 探索率按反比例衰减：epsilon = max(eps_min, eps0 / (1 + eps_k * 周期数))
+        self.eps0 = self.rl_scheduler.epsilon
+        self.eps_min = 0.05
+        self.eps_k = 0.05
     
     def assign_tasks(self):
         """使用RL方法分配任务"""
@@ -1429,16 +1857,15 @@ class RLChargingSimulation(ChargingSimulation):
             return
         
         # 获取所有空闲的机器人
-        idle_robots = [r for r in self.robots 
-                      if r.status == "idle" 
-                      and r.battery 
-                      and r.battery.current_charge > 15]  # 确保有足够电量执行任务
+        idle_robots = self.idle_robots(min_charge=15)  # 确保有足够电量执行任务
         
         if not idle_robots:
             return
         
         # 使用RL调度器分配任务
+        self._refresh_trip_back(idle_robots)
         self.rl_scheduler.assign_rl_tasks(waiting_vehicles, idle_robots)
+        self.waiting_vehicles = [v for v in waiting_vehicles if v.status == WAIT]
         
         # 记录本次分配的奖励总和
         self.current_episode_reward += sum(robot.target_vehicle is not None for robot in idle_robots) * 0.5
@@ -1447,18 +1874,19 @@ class RLChargingSimulation(ChargingSimulation):
         """重写任务完成处理，添加RL奖励机制"""
         vehicle = robot.target_vehicle
         
-        if not vehicle or vehicle.status == "failed":
+        if not vehicle or vehicle.status == FAILED:
             # 车辆已经离开或处理完毕
-            robot.status = "returning"
+            robot.status = RETURNING
             robot.target_vehicle = None
             return
         
         if vehicle.current_charge >= vehicle.required_charge:
             # 充电完成 - 给予额外奖励
-            vehicle.status = "completed"
+            vehicle.status = DONE
             vehicle.charging_end_time = self.current_time
             self.completed_vehicles.append(vehicle)
             self.stats["completed_count"] += 1
+            self.stats["robot_completed_counts"][robot.id] += 1
             
             # 计算等待和充电时间
             if vehicle.charging_start_time is not None:
@@ -1467,25 +1895,17 @@ class RLChargingSimulation(ChargingSimulation):
                 self.stats["total_waiting_time"] += waiting_time
                 self.stats["total_charging_time"] += charging_time
             
-            # 计算RL奖励
-            reward = 10  # 基础奖励
-            
-            # 时间效率奖励
-            if vehicle.charging_start_time is not None:
-                time_efficiency = min(10, 300 / max(10, charging_time))  # 充电效率奖励
-                reward += time_efficiency
-            
-            # 为紧急车辆提供服务的额外奖励
+            # 记录RL奖励所需的数据，奖励在周期结束时由_completion_rewards批量计算
+            charging_time = float(charging_time) if vehicle.charging_start_time is not None else -1.0
             time_left_at_start = vehicle.departure_time - vehicle.charging_start_time if vehicle.charging_start_time else 0
-            if time_left_at_start < 60:
-                reward += 5  # 成功完成紧急任务
-            
-            # 累加奖励
-            self.current_episode_reward += reward
+            self._completion_times.append(charging_time)
+            self._completion_left.append(float(time_left_at_start))
             
-            self.log(f"{self.current_time}分钟: 机器人{robot.id}完成对车辆{vehicle.id}的充电任务，当前电量{vehicle.current_charge:.1f}kWh，RL奖励+{reward:.1f}")
+            if self.verbose:
+                reward = _completion_reward(charging_time, float(time_left_at_start))
+                self.log(f"{self.current_time}分钟: 机器人{robot.id}完成对车辆{vehicle.id}的充电任务，当前电量{vehicle.current_charge:.1f}kWh，RL奖励+{reward:.1f}")
         
-        robot.status = "returning"
+        robot.status = RETURNING
         robot.target_vehicle = None
         vehicle.assigned_robot = None
     
@@ -1493,38 +1913,81 @@ class RLChargingSimulation(ChargingSimulation):
         """重写运行方法，包含强化学习的周期管理"""
         # 重置本周期奖励
         self.current_episode_reward = 0
+        self._completion_times = []
+        self._completion_left = []
         self.training_episodes += 1
         
         # 运行模拟
         stats = super().run()
         
+        # 累加本周期完成充电的奖励
+        self.current_episode_reward += _completion_rewards(np.array(self._completion_times, dtype=np.float64),
+                                                           np.array(self._completion_left, dtype=np.float64))
+        
         # 记录本周期的总奖励
-        self.episode_rewards.append(self.current_episode_reward)
+        if len(self._recent_rewards) == self._recent_rewards.maxlen:
+            self._recent_sum -= self._recent_rewards[0]
+        self._recent_rewards.append(self.current_episode_reward)
+        self._recent_sum += self.current_episode_reward
         
-        # 调整探索率 - 随着学习进行逐渐降低探索
-        if self.training_episodes % 5 == 0 and self.rl_scheduler.epsilon > 0.05:
-            self.rl_scheduler.epsilon *= 0.95
-            self.log(f"强化学习探索率调整为: {self.rl_scheduler.epsilon:.3f}")
+        # 调整探索率 - 每个周期按反比例衰减，随着学习进行逐渐降低探索
+        self.rl_scheduler.epsilon = max(self.eps_min, self.eps0 / (1 + self.eps_k * self.training_episodes))
+        self.log(f"强化学习探索率调整为: {self.rl_scheduler.epsilon:.3f}")
         
         # 打印学习进度
-        avg_reward = sum(self.episode_rewards[-5:]) / min(5, len(self.episode_rewards)) if self.episode_rewards else 0
+        avg_reward = self._recent_sum / len(self._recent_rewards)
         self.log(f"强化学习周期 {self.training_episodes} 完成，总奖励: {self.current_episode_reward:.1f}，最近5次平均: {avg_reward:.1f}")
         
         return stats
 
 
+# PNG使用快速压缩，并且不写入Software元数据
+_PNG_SAVE_KWARGS = {"pil_kwargs": {"compress_level": 1}, "metadata": {"Software": None}}
+
+# 按策略数量缓存的配色；绘图样式只在第一次绘图时设置
+_COLORS = {}
+_style_applied = False
+
+def _strategy_colors(count):
+    """设置统一的绘图样式，并返回count个策略使用的配色"""
+    global _style_applied
+    if not _style_applied:
+        plt.style.use('seaborn-v0_8-darkgrid')
+        _style_applied = True
+    colors = _COLORS.get(count)
+    if colors is None:
+        colors = _COLORS[count] = plt.cm.viridis(np.linspace(0, 1, count))
+    return colors
+
+
+def _label_points(ax, scales, series, fmt, **text_kwargs):
+    """在每个数据点上方10磅处标注数值；series为{策略: 各规模的值}，直接使用ax.text避免annotate的布局开销"""
+    transform = offset_copy(ax.transData, fig=ax.figure, y=10, units='points')
+    for values in series.values():
+        for x, y in zip(scales, values):
+            ax.text(x, y, fmt.format(y), transform=transform, ha='center', va='bottom', **text_kwargs)
+
+
+# 雷达图中"任务分配速度"的主观评分，未列出的策略取75
+_RADAR_SPEED_SCORE = {
+    "nearest_first": 90,      # 简单高效
+    "most_urgent_first": 70,  # 中等复杂度
+    "hybrid_strategy": 60,    # 较复杂
+    "rl": 50,                 # 复杂，需要学习
+}
+
+
 def visualize_results(results, problem_scales):
     """可视化不同策略和问题规模的结果 - 增强版"""
     strategies = list(results.keys())
     scales = list(problem_scales.keys())
     
     # 设置统一的样式
-    plt.style.use('seaborn-v0_8-darkgrid')
-    colors = plt.cm.viridis(np.linspace(0, 1, len(strategies)))
+    colors = _strategy_colors(len(strategies))
     
     # 创建子图网格
-    fig = plt.figure(figsize=(18, 14))
-    gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
+    fig = plt.figure(figsize=(18, 14), constrained_layout=True)
+    gs = fig.add_gridspec(3, 2)
     
     # 1. 完成率对比
     ax1 = fig.add_subplot(gs[0, 0])
@@ -1539,14 +2002,7 @@ def visualize_results(results, problem_scales):
     ax1.grid(True, linestyle='--', alpha=0.7)
     
     # 添加数据标签
-    for i, strategy in enumerate(strategies):
-        for j, value in enumerate(completion_rates[strategy]):
-            ax1.annotate(f'{value:.1f}%', 
-                       xy=(scales[j], value), 
-                       xytext=(0, 10),
-                       textcoords='offset points',
-                       ha='center', va='bottom',
-                       fontsize=9, fontweight='bold')
+    _label_points(ax1, scales, completion_rates, '{:.1f}%', fontsize=9, fontweight='bold')
     
     ax1.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=len(strategies))
     
@@ -1563,14 +2019,7 @@ def visualize_results(results, problem_scales):
     ax2.grid(True, linestyle='--', alpha=0.7)
     
     # 添加数据标签
-    for i, strategy in enumerate(strategies):
-        for j, value in enumerate(waiting_times[strategy]):
-            ax2.annotate(f'{value:.1f}', 
-                       xy=(scales[j], value), 
-                       xytext=(0, 10),
-                       textcoords='offset points',
-                       ha='center', va='bottom',
-                       fontsize=9)
+    _label_points(ax2, scales, waiting_times, '{:.1f}', fontsize=9)
     
     # 3. 机器人利用率对比
     ax3 = fig.add_subplot(gs[1, 0])
@@ -1585,14 +2034,7 @@ def visualize_results(results, problem_scales):
     ax3.grid(True, linestyle='--', alpha=0.7)
     
     # 添加数据标签
-    for i, strategy in enumerate(strategies):
-        for j, value in enumerate(utilization_rates[strategy]):
-            ax3.annotate(f'{value:.1f}%', 
-                       xy=(scales[j], value), 
-                       xytext=(0, 10),
-                       textcoords='offset points',
-                       ha='center', va='bottom',
-                       fontsize=9)
+    _label_points(ax3, scales, utilization_rates, '{:.1f}%', fontsize=9)
     
     # 4. 电池交换次数对比
     ax4 = fig.add_subplot(gs[1, 1])
@@ -1607,14 +2049,7 @@ def visualize_results(results, problem_scales):
     ax4.grid(True, linestyle='--', alpha=0.7)
     
     # 添加数据标签
-    for i, strategy in enumerate(strategies):
-        for j, value in enumerate(battery_swaps[strategy]):
-            ax4.annotate(f'{value}', 
-                       xy=(scales[j], value), 
-                       xytext=(0, 10),
-                       textcoords='offset points',
-                       ha='center', va='bottom',
-                       fontsize=9)
+    _label_points(ax4, scales, battery_swaps, '{}', fontsize=9)
     
     # 5. 综合性能雷达图
     ax5 = fig.add_subplot(gs[2, :], polar=True)
@@ -1627,48 +2062,27 @@ def visualize_results(results, problem_scales):
     angles = np.linspace(0, 2*np.pi, metrics_count, endpoint=False).tolist()
     angles += angles[:1]  # 闭合
     
-    # 为每个策略绘制雷达图
-    for i, strategy in enumerate(strategies):
-        # 收集大规模问题下的各项指标值
-        values = []
-        
+    # 收集大规模问题下各策略的原始指标：完成率、等待时间、利用率、完成数、电池交换次数
+    raw = np.array([[results[s]["大规模"][key] for key in
+                     ("completion_rate", "avg_waiting_time", "avg_robot_utilization",
+                      "completed_count", "battery_swaps")] for s in strategies], dtype=float)
+    max_wait_time = raw[:, 1].max()
+    radar = np.column_stack([
         # 完成率 (0-100)
-        completion = results[strategy]["大规模"]["completion_rate"]
-        values.append(completion)
-        
+        raw[:, 0],
         # 等待时间 (反向，越小越好，范围调整到0-100)
-        wait_time = results[strategy]["大规模"]["avg_waiting_time"]
-        max_wait_time = max([results[s]["大规模"]["avg_waiting_time"] for s in strategies])
-        wait_score = 100 * (1 - wait_time / max_wait_time) if max_wait_time > 0 else 50
-        values.append(wait_score)
-        
-        # 机器人利用率 (0-100)
-        utilization = results[strategy]["大规模"]["avg_robot_utilization"]
-        values.append(min(100, utilization))  # 防止超过100
-        
-        # 电池交换效率 (按照完成任务数/电池交换次数评估，归一化到0-100)
-        completed = results[strategy]["大规模"]["completed_count"]
-        swaps = results[strategy]["大规模"]["battery_swaps"]
-        swap_efficiency = 100 * (completed / max(1, swaps)) / 2  # 除以2使得范围在0-100左右
-        values.append(min(100, swap_efficiency))
-        
-        # 任务分配速度 (基于算法复杂度的主观评分，1-5，再乘以20)
-        if strategy == "nearest_first":
-            speed_score = 90  # 简单高效
-        elif strategy == "most_urgent_first":
-            speed_score = 70  # 中等复杂度
-        elif strategy == "hybrid_strategy":
-            speed_score = 60  # 较复杂
-        elif strategy == "rl":
-            speed_score = 50  # 复杂，需要学习
-        else:
-            speed_score = 75  # 默认值
-        values.append(speed_score)
-        
-        # 闭合雷达图
-        values += values[:1]
-        
-        # 绘制
+        100 * (1 - raw[:, 1] / max_wait_time) if max_wait_time > 0 else np.full(len(strategies), 50.0),
+        # 机器人利用率 (0-100)，防止超过100
+        np.minimum(100, raw[:, 2]),
+        # 电池交换效率 (按照完成任务数/电池交换次数评估，除以2使得范围在0-100左右)
+        np.minimum(100, 50 * raw[:, 3] / np.maximum(1, raw[:, 4])),
+        # 任务分配速度 (基于算法复杂度的主观评分)
+        [_RADAR_SPEED_SCORE.get(s, 75) for s in strategies],
+    ])
+    
+    # 为每个策略绘制雷达图，首项重复一次以闭合
+    for i, strategy in enumerate(strategies):
+        values = np.r_[radar[i], radar[i, 0]]
         ax5.plot(angles, values, 'o-', lw=2, color=colors[i], label=strategy)
         ax5.fill(angles, values, color=colors[i], alpha=0.25)
     
@@ -1682,12 +2096,11 @@ def visualize_results(results, problem_scales):
     ax5.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05), ncol=len(strategies))
     
     # 保存图表
-    plt.tight_layout()
-    plt.savefig('charging_strategies_comparison.png', dpi=300, bbox_inches='tight')
+    fig.savefig('charging_strategies_comparison.png', dpi=300, **_PNG_SAVE_KWARGS)
     plt.close(fig)
     
     # 额外创建一个表格形式的结果展示
-    fig, ax = plt.figure(figsize=(12, 8)), plt.subplot(111)
+    fig, ax = plt.subplots(figsize=(12, 8), constrained_layout=True)
     ax.axis('off')
     ax.axis('tight')
     
@@ -1713,53 +2126,100 @@ def visualize_results(results, problem_scales):
     table = ax.table(cellText=table_data, colLabels=headers, loc='center', cellLoc='center')
     table.auto_set_font_size(False)
     table.set_fontsize(10)
-    table.scale(1.2, 1.5)
-    
-    # 设置表格样式
-    for (i, j), cell in table.get_celld().items():
-        if i == 0:  # 表头行
-            cell.set_text_props(fontweight='bold', color='white')
-            cell.set_facecolor('#4472C4')
-        elif i % 3 == 1:  # 每个策略的第一个规模
-            cell.set_facecolor('#E6F0FF')
-        elif i % 3 == 2:  # 每个策略的第二个规模 
-            cell.set_facecolor('#D6E5FF')
-        else:  # 每个策略的第三个规模
-            cell.set_facecolor('#C6DBFF')
-            
-        if j == 0 and i > 0:  # 策略名称列
-            prev_strategy = table_data[i-1][0] if i > 1 else None
-            curr_strategy = table_data[i-1][0]
-            if i == 1 or prev_strategy != curr_strategy:
-                cell.set_text_props(fontweight='bold')
-    
-    plt.title('充电机器人调度策略性能对比表', fontsize=16, fontweight='bold', pad=20)
-    plt.tight_layout()
-    plt.savefig('charging_strategies_table.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    table.scale(1, 1.5)
+    table.auto_set_column_width(0)  # 策略名称较长，按内容调整第一列宽度，避免超出图像边缘
+    
+    # 设置表格样式：表头行，其余各行按规模依次使用三种底色
+    row_colors = ('#E6F0FF', '#D6E5FF', '#C6DBFF')
+    for j in range(len(headers)):
+        cell = table[0, j]
+        cell.set_text_props(fontweight='bold', color='white')
+        cell.set_facecolor('#4472C4')
+    for i in range(1, len(table_data) + 1):
+        color = row_colors[(i - 1) % 3]
+        for j in range(len(headers)):
+            table[i, j].set_facecolor(color)
+        # 每个策略第一行的策略名称加粗
+        if (i - 1) % len(scales) == 0:
+            table[i, 0].set_text_props(fontweight='bold')
+    
+    ax.set_title('充电机器人调度策略性能对比表', fontsize=16, fontweight='bold', pad=20)
+    fig.savefig('charging_strategies_table.png', dpi=150, **_PNG_SAVE_KWARGS)
+    plt.close(fig)
 
 
-def run_simulation(strategies, problem_scales):
-    """运行不同策略和规模的模拟 - 增强版"""
-    results = {}
-    
-    for strategy in strategies:
-        results[strategy] = {}
-        for scale in problem_scales:
-            print(f"运行 {strategy} 策略，{scale}规模...")
-            
-            # 创建合适的模拟实例
-            if strategy == "rl":
-                sim = RLChargingSimulation(scale=scale)
-            else:
-                sim = ChargingSimulation(scale=scale, scheduling_strategy=strategy)
-            
-            # 设置和运行
-            sim.setup()
-            stats = sim.run()
-            results[strategy][scale] = stats
+# 模拟结果缓存目录；缓存键包含规模参数、种子和本模块源码的哈希，代码、参数或种子变化后自动失效
+RESULTS_CACHE_DIR = os.path.join("results", "cache")
+
+# 策略对比默认使用的根种子，固定后各次运行（含部分命中缓存时）都在相同的问题实例上比较
+DEFAULT_SEED = 0
+
+def results_digest(scale, seed):
+    """规模参数、种子和本模块源码的哈希，作为模拟结果缓存的版本键；seed为整数或SeedSequence"""
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    digest = hashlib.md5(repr((PROBLEM_SCALES[scale], seed.entropy, seed.spawn_key)).encode())
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+
+def _cache_path(strategy, scale, seed):
+    """(策略, 规模, 种子)对应的结果缓存文件路径，seed为生成问题实例的SeedSequence"""
+    return os.path.join(RESULTS_CACHE_DIR, f"{strategy}_{scale}_{results_digest(scale, seed)}.pkl")
+
+
+def _run_one(strategy, scale, seed, use_cache=True):
+    """在工作进程中运行一次模拟并写出日志，返回(策略, 规模, 统计信息)；seed为决定问题实例的SeedSequence，
+    use_cache时优先读取磁盘缓存"""
+    path = _cache_path(strategy, scale, seed)
+    if use_cache and os.path.exists(path):
+        with open(path, "rb") as f:
+            return strategy, scale, pickle.load(f)
+    
+    # 创建合适的模拟实例
+    if strategy == "rl":
+        sim = RLChargingSimulation(scale=scale, seed=seed)
+    else:
+        sim = ChargingSimulation(scale=scale, scheduling_strategy=strategy, seed=seed)
+    
+    # 设置和运行
+    sim.setup()
+    stats = sim.run()
+    
+    # 保存更详细的日志（可选）
+    with open(f"{strategy}_{scale}_log.txt", "w") as f:
+        for log in sim.logs:  # 模拟只保留最后100条日志，避免文件过大
+            f.write(log + "\n")
+    
+    # 先写临时文件再替换，避免留下不完整的缓存
+    os.makedirs(RESULTS_CACHE_DIR, exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(stats, f)
+    os.replace(path + ".tmp", path)
+    
+    return strategy, scale, stats
+
+
+def run_simulation(strategies, problem_scales, use_cache=True, seed=DEFAULT_SEED):
+    """运行不同策略和规模的模拟 - 各组合相互独立，在多个进程中并行运行；use_cache为False时忽略已有缓存，
+    seed为根种子"""
+    tasks = [(strategy, scale) for strategy in strategies for scale in problem_scales]
+    # 按PROBLEM_SCALES中的顺序为每个规模从根种子派生一个子种子，同一规模下所有策略共用，在同一问题实例上比较；
+    # 只运行部分规模时各规模的实例也不变
+    root_seed = np.random.SeedSequence(seed)
+    scale_seeds = dict(zip(PROBLEM_SCALES, root_seed.spawn(len(PROBLEM_SCALES))))
+    finished = {}
+    
+    with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(_run_one, strategy, scale, scale_seeds[scale], use_cache)
+                   for strategy, scale in tasks]
+        for future in as_completed(futures):
+            strategy, scale, stats = future.result()
+            finished[strategy, scale] = stats
             
             # 输出关键指标
+            print(f"{strategy} 策略，{scale}规模:")
             print(f"  完成率: {stats['completion_rate']:.2f}%")
             print(f"  完成车辆数: {stats['completed_count']}")
             print(f"  失败车辆数: {stats['failed_count']}")
@@ -1767,17 +2227,21 @@ def run_simulation(strategies, problem_scales):
             print(f"  平均充电时间: {stats['avg_charging_time']:.2f}分钟")
             print(f"  机器人平均利用率: {stats['avg_robot_utilization']:.2f}%")
             print(f"  电池更换次数: {stats['battery_swaps']}")
-            
-            # 保存更详细的日志（可选）
-            with open(f"{strategy}_{scale}_log.txt", "w") as f:
-                for log in sim.logs[-100:]:  # 只保存最后100条日志避免文件过大
-                    f.write(log + "\n")
     
+    # 按输入顺序整理结果
+    results = {strategy: {} for strategy in strategies}
+    for strategy, scale in tasks:
+        results[strategy][scale] = finished[strategy, scale]
     return results
 
 
 # 主函数：运行模拟并比较不同策略
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="充电机器人调度策略对比")
+    parser.add_argument("--no-cache", action="store_true", help="忽略results/cache中的模拟结果缓存，重新运行")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="生成问题实例的根种子")
+    args = parser.parse_args(argv)
+    
     # 定义不同的调度策略，包含新的混合策略
     strategies = [
         "nearest_first",       # 最近任务优先
@@ -1785,42 +2249,22 @@ def main():
         "earliest_deadline_first", # 最早截止时间优先
         "most_urgent_first",   # 最紧急任务优先
         "hybrid_strategy",     # 新增：混合策略
+        "rl",                  # 强化学习调度模型
     ]
     
-    # 运行模拟
-    results = run_simulation(strategies, PROBLEM_SCALES)
-    
-    # 可视化结果
+    # 运行模拟并统一绘图
+    results = run_simulation(strategies, PROBLEM_SCALES, use_cache=not args.no_cache, seed=args.seed)
     visualize_results(results, PROBLEM_SCALES)
     
-    # 额外：运行强化学习调度模型
-    print("\n运行强化学习调度模型...")
-    rl_results = {}
-    for scale in PROBLEM_SCALES:
-        print(f"运行 RL 策略，{scale}规模...")
-        sim = RLChargingSimulation(scale=scale)
-        sim.setup()
-        stats = sim.run()
-        if "rl" not in rl_results:
-            rl_results["rl"] = {}
-        rl_results["rl"][scale] = stats
-        
-        print(f"  完成率: {stats['completion_rate']:.2f}%")
-        print(f"  平均等待时间: {stats['avg_waiting_time']:.2f}分钟")
-        print(f"  平均充电时间: {stats['avg_charging_time']:.2f}分钟")
-        print(f"  机器人平均利用率: {stats['avg_robot_utilization']:.2f}%")
-    
-    # 合并结果并重新可视化
-    combined_results = {**results, **rl_results}
-    visualize_results(combined_results, PROBLEM_SCALES)
-    
     # 比较最佳策略
     print("\n策略性能对比：")
-    for scale in PROBLEM_SCALES:
-        best_strategy = max(combined_results.keys(), 
-                          key=lambda s: combined_results[s][scale]["completion_rate"])
+    # 完成率矩阵（策略 × 规模），按列取最大值
+    completion = np.array([[results[s][scale]["completion_rate"] for scale in PROBLEM_SCALES]
+                           for s in strategies])
+    for scale, best in zip(PROBLEM_SCALES, completion.argmax(axis=0)):
+        best_strategy = strategies[best]
         print(f"{scale}问题最佳策略: {best_strategy}, "
-             f"完成率: {combined_results[best_strategy][scale]['completion_rate']:.2f}%")
+             f"完成率: {results[best_strategy][scale]['completion_rate']:.2f}%")
 
 
 if __name__ == "__main__":
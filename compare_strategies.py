@@ -1,14 +1,17 @@
+import matplotlib
+matplotlib.use('Agg')  # Headless: figures are only written to files
 import matplotlib.pyplot as plt
 import numpy as np
+import hashlib
 import os
-from charging_robots_simulation import ChargingSimulation, PROBLEM_SCALES
+from concurrent.futures import ProcessPoolExecutor
+from charging_robots_simulation import ChargingSimulation, PROBLEM_SCALES, _PNG_SAVE_KWARGS, results_digest
 
 # Create results directory if it doesn't exist
-if not os.path.exists("results"):
-    os.makedirs("results")
+os.makedirs("results", exist_ok=True)
 
-def run_comparative_simulation(scale="small", duration=24*60):
-    """Run simulations with all strategies and compare results"""
+def run_comparative_simulation(scale="small", duration=24*60, seed=None):
+    """Run simulations with all strategies and compare results; a fixed seed makes the instance reproducible"""
     strategies = [
         "nearest_first",
         "max_charge_need_first", 
@@ -17,11 +20,16 @@ def run_comparative_simulation(scale="small", duration=24*60):
     ]
     
     results = {}
+    # Every strategy solves the same generated problem instance: set it up once
+    # for the first strategy, then regenerate it with reset() for the others
+    sim = ChargingSimulation(scale=scale, scheduling_strategy=strategies[0], seed=seed)
     
-    for strategy in strategies:
+    for i, strategy in enumerate(strategies):
         print(f"Running simulation with {strategy} strategy...")
-        sim = ChargingSimulation(scale=scale, scheduling_strategy=strategy)
-        sim.setup()
+        if i == 0:
+            sim.setup()
+        else:
+            sim.reset(strategy)
         stats = sim.run()
         
         # Store results
@@ -46,105 +54,117 @@ def run_comparative_simulation(scale="small", duration=24*60):
     return results
 
 
+def comparison_key(scale, seed):
+    """Version key for cached run_comparative_simulation(scale, seed=seed) results:
+    the simulation digest plus a hash of this module's source"""
+    digest = hashlib.md5(results_digest(scale, seed).encode())
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+
+# Display names for strategies in the comparison graphs
+_STRATEGY_DISPLAY = {
+    "nearest_first": "Nearest First",
+    "max_charge_need_first": "Max Charge Need",
+    "earliest_deadline_first": "Earliest Deadline",
+    "most_urgent_first": "Most Urgent"
+}
+
+
 def generate_comparison_graphs(results, scale, filename="strategy_comparison"):
     """Generate graphs comparing different strategies"""
     # Setup
-    plt.figure(figsize=(15, 12))
-    
-    # Convert strategy names for display
-    strategy_names = {
-        "nearest_first": "Nearest First",
-        "max_charge_need_first": "Max Charge Need",
-        "earliest_deadline_first": "Earliest Deadline",
-        "most_urgent_first": "Most Urgent"
-    }
+    fig, ((ax_cr, ax_tw), (ax_ut, ax_vc)) = plt.subplots(2, 2, figsize=(15, 12), constrained_layout=True)
     
     strategies = list(results.keys())
+    tick_labels = [_STRATEGY_DISPLAY.get(s, s) for s in strategies]
     x = np.arange(len(strategies))
     width = 0.2
     
     # 1. Completion Rate Comparison
-    plt.subplot(2, 2, 1)
     completion_rates = [results[s]["completion_rate"] for s in strategies]
-    plt.bar(x, completion_rates, width=0.6)
-    plt.ylabel('Completion Rate (%)')
-    plt.title(f'Completion Rate Comparison ({scale} Scale)')
-    plt.xticks(x, [strategy_names.get(s, s) for s in strategies], rotation=45)
+    ax_cr.bar(x, completion_rates, width=0.6)
+    ax_cr.set_ylabel('Completion Rate (%)')
+    ax_cr.set_title(f'Completion Rate Comparison ({scale} Scale)')
+    ax_cr.set_xticks(x, tick_labels, rotation=45)
     
     for i, v in enumerate(completion_rates):
-        plt.text(i, v + 1, f"{v:.1f}%", ha='center')
+        ax_cr.text(i, v + 1, f"{v:.1f}%", ha='center')
     
     # 2. Waiting and Charging Time Comparison
-    plt.subplot(2, 2, 2)
     waiting_times = [results[s]["avg_waiting_time"] for s in strategies]
     charging_times = [results[s]["avg_charging_time"] for s in strategies]
     
-    x1 = np.arange(len(strategies))
-    x2 = [x + width for x in x1]
+    ax_tw.bar(x, waiting_times, width, label='Avg. Waiting Time')
+    ax_tw.bar(x + width, charging_times, width, label='Avg. Charging Time')
     
-    plt.bar(x1, waiting_times, width, label='Avg. Waiting Time')
-    plt.bar(x2, charging_times, width, label='Avg. Charging Time')
-    
-    plt.ylabel('Time (minutes)')
-    plt.title(f'Time Comparison ({scale} Scale)')
-    plt.xticks([x + width/2 for x in x1], [strategy_names.get(s, s) for s in strategies], rotation=45)
-    plt.legend()
+    ax_tw.set_ylabel('Time (minutes)')
+    ax_tw.set_title(f'Time Comparison ({scale} Scale)')
+    ax_tw.set_xticks(x + width/2, tick_labels, rotation=45)
+    ax_tw.legend()
     
     # 3. Robot Utilization Comparison
-    plt.subplot(2, 2, 3)
     utilization = [results[s]["avg_robot_utilization"] for s in strategies]
-    plt.bar(x, utilization, width=0.6)
-    plt.ylabel('Utilization (%)')
-    plt.title(f'Robot Utilization Comparison ({scale} Scale)')
-    plt.xticks(x, [strategy_names.get(s, s) for s in strategies], rotation=45)
+    ax_ut.bar(x, utilization, width=0.6)
+    ax_ut.set_ylabel('Utilization (%)')
+    ax_ut.set_title(f'Robot Utilization Comparison ({scale} Scale)')
+    ax_ut.set_xticks(x, tick_labels, rotation=45)
     
     for i, v in enumerate(utilization):
-        plt.text(i, v + 1, f"{v:.1f}%", ha='center')
+        ax_ut.text(i, v + 1, f"{v:.1f}%", ha='center')
     
     # 4. Completed vs Failed Vehicles
-    plt.subplot(2, 2, 4)
     completed = [results[s]["completed_count"] for s in strategies]
     failed = [results[s]["failed_count"] for s in strategies]
     
-    x1 = np.arange(len(strategies))
-    x2 = [x + width for x in x1]
-    
-    plt.bar(x1, completed, width, label='Completed')
-    plt.bar(x2, failed, width, label='Failed')
+    ax_vc.bar(x, completed, width, label='Completed')
+    ax_vc.bar(x + width, failed, width, label='Failed')
     
-    plt.ylabel('Vehicle Count')
-    plt.title(f'Vehicle Completion Comparison ({scale} Scale)')
-    plt.xticks([x + width/2 for x in x1], [strategy_names.get(s, s) for s in strategies], rotation=45)
-    plt.legend()
+    ax_vc.set_ylabel('Vehicle Count')
+    ax_vc.set_title(f'Vehicle Completion Comparison ({scale} Scale)')
+    ax_vc.set_xticks(x + width/2, tick_labels, rotation=45)
+    ax_vc.legend()
     
-    # Save the figure
-    plt.tight_layout()
-    plt.savefig(f"results/{filename}_{scale}.png")
-    plt.close()
+    # Save the figure and release it
+    fig.savefig(f"results/{filename}_{scale}.png", **_PNG_SAVE_KWARGS)
+    plt.close(fig)
 
 
-def run_all_comparisons():
-    """Run comparisons for all problem scales"""
-    for scale in PROBLEM_SCALES.keys():
-        print(f"\nRunning comparison for {scale} scale")
-        results = run_comparative_simulation(scale=scale)
+def run_all_comparisons(seed=None):
+    """Run comparisons for all problem scales in parallel and return {scale: results}"""
+    scales = list(PROBLEM_SCALES)
+    # Each scale is independent, so run them in separate processes
+    with ProcessPoolExecutor(max_workers=min(len(scales), os.cpu_count() or 1)) as executor:
+        futures = {scale: executor.submit(run_comparative_simulation, scale=scale, seed=seed) for scale in scales}
+        all_results = {scale: future.result() for scale, future in futures.items()}
+    
+    for scale, results in all_results.items():
+        print(f"\nComparison for {scale} scale")
         
         # Display summary of best strategy for each metric
         print("\nBest strategies by metric:")
         
+        strategies = list(results)
+        metrics = np.array([[results[s]["completion_rate"],
+                             results[s]["avg_waiting_time"],
+                             results[s]["avg_robot_utilization"]] for s in strategies])
+        
         # Completion rate
-        best_strategy = max(results.items(), key=lambda x: x[1]["completion_rate"])[0]
+        best_strategy = strategies[metrics[:, 0].argmax()]
         print(f"  Highest completion rate: {best_strategy} ({results[best_strategy]['completion_rate']:.1f}%)")
         
         # Waiting time (lower is better)
-        best_strategy = min(results.items(), key=lambda x: x[1]["avg_waiting_time"])[0]
+        best_strategy = strategies[metrics[:, 1].argmin()]
         print(f"  Lowest waiting time: {best_strategy} ({results[best_strategy]['avg_waiting_time']:.1f} min)")
         
         # Robot utilization
-        best_strategy = max(results.items(), key=lambda x: x[1]["avg_robot_utilization"])[0]
+        best_strategy = strategies[metrics[:, 2].argmax()]
         print(f"  Highest robot utilization: {best_strategy} ({results[best_strategy]['avg_robot_utilization']:.1f}%)")
         
         print("\n" + "="*50)
+    
+    return all_results
 
 
 if __name__ == "__main__":
@@ -1,23 +1,49 @@
 import sys
 import os
+import atexit
+import pickle
 
-import pygame
-from charging_robots_simulation import ChargingSimulation, PROBLEM_SCALES
+import importlib.util
 
-# 导入游戏模块（假设充电机器人游戏文件名为charging_robots_game.py）
-try:
-    from charging_robots_game import run_game
-except ImportError:
+# 游戏模块（pygame）和比较策略模块（numpy、matplotlib）导入较慢，启动时只检查是否存在，用到时再导入
+HAS_GAME = importlib.util.find_spec("charging_robots_game") is not None
+if not HAS_GAME:
     print("游戏模块未找到，请确保charging_robots_game.py文件存在")
-    run_game = None
 
-# 导入比较策略模块
-try:
-    from compare_strategies import run_comparative_simulation, run_all_comparisons
-except ImportError:
+HAS_COMPARISON = importlib.util.find_spec("compare_strategies") is not None
+if not HAS_COMPARISON:
     print("比较策略模块未找到，请确保compare_strategies.py文件存在")
-    run_comparative_simulation = None
-    run_all_comparisons = None
+
+# 策略比较结果缓存（规模 -> (版本键, 结果)），启动时从磁盘读取，退出时写回，重复选择同一规模时无需重新模拟。
+# 比较使用固定种子，版本键为规模参数、种子以及模拟和比较模块源码的哈希，代码或参数变化后旧结果自动失效
+COMPARISON_CACHE_FILE = os.path.join("results", "cache.pkl")
+_COMPARISON_CACHE = {}
+
+def load_comparison_cache():
+    """读取磁盘上的比较结果缓存，并在退出时写回"""
+    if os.path.exists(COMPARISON_CACHE_FILE):
+        with open(COMPARISON_CACHE_FILE, "rb") as f:
+            _COMPARISON_CACHE.update(pickle.load(f))
+    atexit.register(save_comparison_cache)
+
+def save_comparison_cache():
+    """将比较结果缓存写入磁盘"""
+    if _COMPARISON_CACHE:
+        create_results_dir()
+        with open(COMPARISON_CACHE_FILE, "wb") as f:
+            pickle.dump(_COMPARISON_CACHE, f)
+
+def _cached_comparison(scale):
+    """返回(指定规模的策略比较结果, 是否取自缓存)，已用当前代码和参数运行过的规模直接取缓存"""
+    from charging_robots_simulation import DEFAULT_SEED
+    from compare_strategies import comparison_key, run_comparative_simulation
+    key = comparison_key(scale, DEFAULT_SEED)
+    entry = _COMPARISON_CACHE.get(scale)
+    if isinstance(entry, tuple) and entry[0] == key:
+        return entry[1], True
+    results = run_comparative_simulation(scale=scale, seed=DEFAULT_SEED)
+    _COMPARISON_CACHE[scale] = (key, results)
+    return results, False
 
 def print_header():
     """打印程序标题"""
@@ -26,10 +52,66 @@ def print_header():
     print("="*60)
 
 def create_results_dir():
-    """创建结果目录"""
-    if not os.path.exists("results"):
-        os.makedirs("results")
-        print("创建结果目录: results/")
+    """创建结果目录，已存在时不做任何事（多个进程同时调用也安全）"""
+    os.makedirs("results", exist_ok=True)
+
+# 菜单编号 -> 问题规模 / 调度策略
+SCALE_MAP = {"1": "小规模", "2": "中规模", "3": "大规模"}
+STRATEGY_MAP = {
+    "1": "nearest_first",
+    "2": "max_charge_need_first",
+    "3": "earliest_deadline_first",
+    "4": "most_urgent_first",
+}
+
+def _pause():
+    input("按Enter键继续...")
+
+def _missing_module(filename, name):
+    """提示所需模块不存在"""
+    print(f"\n错误: {name}模块未找到。请确保{filename}文件存在。")
+    _pause()
+
+def _invalid_choice():
+    print("\n无效选择，请重试。")
+    _pause()
+
+def _menu_visualization():
+    if HAS_GAME:
+        run_visualization_menu()
+    else:
+        _missing_module("charging_robots_game.py", "游戏")
+
+def _menu_comparison():
+    if HAS_COMPARISON:
+        run_comparison_menu()
+    else:
+        _missing_module("compare_strategies.py", "比较策略")
+
+def _menu_all_comparisons():
+    if not HAS_COMPARISON:
+        _missing_module("compare_strategies.py", "比较策略")
+        return
+    from compare_strategies import comparison_key, run_all_comparisons
+    from charging_robots_simulation import DEFAULT_SEED
+    create_results_dir()
+    print("\n运行所有规模的比较...")
+    for scale, results in run_all_comparisons(seed=DEFAULT_SEED).items():
+        _COMPARISON_CACHE[scale] = (comparison_key(scale, DEFAULT_SEED), results)
+    print("\n所有比较完成！结果已保存到results目录。")
+    _pause()
+
+def _menu_quit():
+    print("\n感谢使用充电机器人调度模拟系统！")
+    sys.exit(0)
+
+# 主菜单编号 -> 处理函数
+MAIN_ACTIONS = {
+    "1": _menu_visualization,
+    "2": _menu_comparison,
+    "3": _menu_all_comparisons,
+    "4": _menu_quit,
+}
 
 def main_menu():
     """显示主菜单并处理用户选择"""
@@ -42,112 +124,148 @@ def main_menu():
         print("4. 退出")
         
         choice = input("\n请选择 (1-4): ")
-        
-        if choice == "1":
-            if run_game:
-                run_visualization_menu()
-            else:
-                print("\n错误: 游戏模块未找到。请确保charging_robots_game.py文件存在。")
-                input("按Enter键继续...")
-        elif choice == "2":
-            if run_comparative_simulation:
-                run_comparison_menu()
-            else:
-                print("\n错误: 比较策略模块未找到。请确保compare_strategies.py文件存在。")
-                input("按Enter键继续...")
-        elif choice == "3":
-            if run_all_comparisons:
-                create_results_dir()
-                print("\n运行所有规模的比较...")
-                run_all_comparisons()
-                print("\n所有比较完成！结果已保存到results目录。")
-                input("按Enter键继续...")
-            else:
-                print("\n错误: 比较策略模块未找到。请确保compare_strategies.py文件存在。")
-                input("按Enter键继续...")
-        elif choice == "4":
-            print("\n感谢使用充电机器人调度模拟系统！")
-            sys.exit(0)
-        else:
-            print("\n无效选择，请重试。")
-            input("按Enter键继续...")
+        MAIN_ACTIONS.get(choice, _invalid_choice)()
+
+# 窗口内菜单使用的字体：按顺序查找可显示中文的系统字体，都没有时改用终端菜单
+MENU_FONT_NAMES = "notosanscjksc,notosanscjk,wenquanyimicrohei,simhei,microsoftyahei,pingfangsc"
+MENU_FONT_SIZE = 28
+MENU_FPS = 30
+MENU_BG = (255, 255, 255)
+MENU_FG = (0, 0, 0)
+
+# 首次进入可视化菜单时预加载的pygame资源，之后再进入时复用
+ASSETS = {}
+
+def init_pygame():
+    """初始化pygame并预加载菜单字体，已初始化时跳过；没有可显示中文的字体时ASSETS["font"]为None"""
+    import pygame
+    if not pygame.get_init():
+        pygame.init()
+    if "font" not in ASSETS:
+        # SysFont找不到时会静默退回不含中文字形的默认字体，因此先确认确实匹配到了字体文件
+        path = pygame.font.match_font(MENU_FONT_NAMES)
+        ASSETS["font"] = pygame.font.Font(path, MENU_FONT_SIZE) if path else None
+
+def draw_menu_lines(surface, font, lines):
+    """清空窗口并逐行显示文字"""
+    import pygame
+    surface.fill(MENU_BG)
+    y = 40
+    for line in lines:
+        surface.blit(font.render(line, True, MENU_FG), (60, y))
+        y += font.get_linesize() + 6
+    pygame.display.flip()
+
+def pygame_menu_loop(surface, font, lines, choices=None):
+    """在窗口中显示若干行文字并等待按键，返回按下的choices中的字符；
+    choices为None时按任意键返回None，按ESC或关闭窗口也返回None"""
+    import pygame
+    draw_menu_lines(surface, font, lines if choices is not None else [*lines, "", "按任意键返回"])
+    
+    clock = pygame.time.Clock()
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return None
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE or choices is None:
+                    return None
+                if event.unicode and event.unicode in choices:
+                    return event.unicode
+        clock.tick(MENU_FPS)
+
+def terminal_prompt(lines, choices=None):
+    """在终端中显示若干行文字并读取选择，返回输入的choices中的字符，输入无效时重新输入；
+    choices为None时按Enter键返回None"""
+    print_header()
+    for line in lines:
+        print(line)
+    if choices is None:
+        input("\n按Enter键返回...")
+        return None
+    while True:
+        choice = input(f"\n请选择 ({choices[0]}-{choices[-1]}): ")
+        if len(choice) == 1 and choice in choices:
+            return choice
+        print("\n无效选择，请重试。")
 
 def run_visualization_menu():
-    """可视化模拟菜单"""
+    """可视化模拟菜单：有中文字体时在游戏窗口中按数字键选择规模和策略（ESC返回），否则在终端中选择。
+    窗口只在需要时打开，返回终端前关闭，避免无人处理事件的窗口被系统判定为无响应"""
+    import pygame
+    from charging_robots_game import open_display, run_game
+    init_pygame()
+    font = ASSETS["font"]
+    
+    if font is None:
+        # 窗口只在模拟运行期间打开
+        def run_and_close(scale, strategy):
+            try:
+                return run_game(scale, strategy)
+            finally:
+                pygame.display.quit()
+        _visualization_menu_loop(terminal_prompt, run_and_close)
+        return
+    
+    surface = open_display()
+    try:
+        _visualization_menu_loop(lambda lines, choices=None: pygame_menu_loop(surface, font, lines, choices),
+                                 run_game)
+    finally:
+        pygame.display.quit()
+
+def _visualization_menu_loop(prompt, run_game):
+    """依次选择规模和策略，运行一次可视化模拟并显示结果；
+    prompt(lines, choices)显示菜单并返回所选项，返回None或未列出的选项表示返回"""
     while True:
-        print_header()
-        print("\n可视化模拟设置:")
-        
         # 选择规模
-        print("\n选择问题规模:")
-        print("1. 小规模")
-        print("2. 中规模")
-        print("3. 大规模")
-        print("4. 返回主菜单")
-        
-        scale_choice = input("\n请选择规模 (1-4): ")
-        
-        if scale_choice == "4":
-            return
+        scale_choice = prompt([
+            "可视化模拟设置",
+            "",
+            "选择问题规模:",
+            "1. 小规模",
+            "2. 中规模",
+            "3. 大规模",
+            "4. 返回主菜单",
+        ], "1234")
         
-        if scale_choice == "1":
-            scale = "小规模"
-        elif scale_choice == "2":
-            scale = "中规模"
-        elif scale_choice == "3":
-            scale = "大规模"
-        else:
-            print("\n无效选择，请重试。")
-            input("按Enter键继续...")
-            continue
-        
-        # 选择策略
-        print("\n选择调度策略:")
-        print("1. 最近优先")
-        print("2. 最大充电需求优先")
-        print("3. 最早截止时间优先")
-        print("4. 最紧急任务优先")
-        print("5. 返回规模选择")
+        scale = SCALE_MAP.get(scale_choice)
+        if scale is None:
+            break
         
-        strategy_choice = input("\n请选择策略 (1-5): ")
+        # 选择策略，选定后立即开始模拟
+        strategy_choice = prompt([
+            f"问题规模: {scale}",
+            "",
+            "选择调度策略:",
+            "1. 最近优先",
+            "2. 最大充电需求优先",
+            "3. 最早截止时间优先",
+            "4. 最紧急任务优先",
+            "5. 返回规模选择",
+            "",
+            "模拟中按空格键暂停/继续，上/下箭头键调整速度，ESC键退出",
+        ], "12345")
         
-        if strategy_choice == "5":
+        strategy = STRATEGY_MAP.get(strategy_choice)
+        if strategy is None:
             continue
         
-        if strategy_choice == "1":
-            strategy = "nearest_first"
-        elif strategy_choice == "2":
-            strategy = "max_charge_need_first"
-        elif strategy_choice == "3":
-            strategy = "earliest_deadline_first"
-        elif strategy_choice == "4":
-            strategy = "most_urgent_first"
-        else:
-            print("\n无效选择，请重试。")
-            input("按Enter键继续...")
-            continue
-        
-        # 运行可视化模拟
-        print(f"\n运行{scale}的{strategy}策略可视化模拟...")
-        print("\n按空格键暂停/继续模拟")
-        print("按上/下箭头键调整模拟速度")
-        print("按ESC键退出模拟")
-        input("按Enter键开始...")
-        
         # 运行游戏
         stats = run_game(scale, strategy)
         
         # 显示结果
-        print("\n模拟结束！结果:")
-        print(f"完成率: {stats['completion_rate']:.2f}%")
-        print(f"完成车辆数: {stats['completed_count']}")
-        print(f"失败车辆数: {stats['failed_count']}")
-        print(f"平均等待时间: {stats['avg_waiting_time']:.2f}分钟")
-        print(f"平均充电时间: {stats['avg_charging_time']:.2f}分钟")
-        print(f"机器人平均利用率: {stats['avg_robot_utilization']:.2f}%")
-        print(f"电池更换次数: {stats['battery_swaps']}")
-        
-        input("\n按Enter键返回菜单...")
+        prompt([
+            f"模拟结束！{scale} {strategy} 结果:",
+            "",
+            f"完成率: {stats['completion_rate']:.2f}%",
+            f"完成车辆数: {stats['completed_count']}",
+            f"失败车辆数: {stats['failed_count']}",
+            f"平均等待时间: {stats['avg_waiting_time']:.2f}分钟",
+            f"平均充电时间: {stats['avg_charging_time']:.2f}分钟",
+            f"机器人平均利用率: {stats['avg_robot_utilization']:.2f}%",
+            f"电池更换次数: {stats['battery_swaps']}",
+        ])
         return
 
 def run_comparison_menu():
@@ -167,15 +285,9 @@ def run_comparison_menu():
     if scale_choice == "4":
         return
     
-    if scale_choice == "1":
-        scale = "小规模"
-    elif scale_choice == "2":
-        scale = "中规模"
-    elif scale_choice == "3":
-        scale = "大规模"
-    else:
-        print("\n无效选择，请重试。")
-        input("按Enter键继续...")
+    scale = SCALE_MAP.get(scale_choice)
+    if scale is None:
+        _invalid_choice()
         return
     
     # 创建结果目录
@@ -183,26 +295,35 @@ def run_comparison_menu():
     
     # 运行比较
     print(f"\n运行{scale}规模的策略比较...")
-    results = run_comparative_simulation(scale=scale)
+    results, cached = _cached_comparison(scale)
     
     # 显示结果
-    print("\n比较完成！结果:")
+    print("\n比较完成（使用缓存的结果）！结果:" if cached else "\n比较完成！结果:")
     
-    # 计算最佳策略
-    best_completion = max(results.items(), key=lambda x: x[1]["completion_rate"])[0]
-    best_waiting = min(results.items(), key=lambda x: x[1]["avg_waiting_time"])[0]
-    best_utilization = max(results.items(), key=lambda x: x[1]["avg_robot_utilization"])[0]
+    # 一次遍历同时找出各项指标的最佳策略（并列时取先出现的）
+    best_completion = best_waiting = best_utilization = None
+    top_completion = top_utilization = float("-inf")
+    low_waiting = float("inf")
+    for name, r in results.items():
+        if r["completion_rate"] > top_completion:
+            top_completion, best_completion = r["completion_rate"], name
+        if r["avg_waiting_time"] < low_waiting:
+            low_waiting, best_waiting = r["avg_waiting_time"], name
+        if r["avg_robot_utilization"] > top_utilization:
+            top_utilization, best_utilization = r["avg_robot_utilization"], name
     
     print(f"最高完成率: {best_completion} ({results[best_completion]['completion_rate']:.1f}%)")
     print(f"最低等待时间: {best_waiting} ({results[best_waiting]['avg_waiting_time']:.1f}分钟)")
     print(f"最高机器人利用率: {best_utilization} ({results[best_utilization]['avg_robot_utilization']:.1f}%)")
     
-    print("\n详细结果已保存到 results 目录。")
+    if not cached:
+        print("\n详细结果已保存到 results 目录。")
     input("\n按Enter键返回主菜单...")
 
 if __name__ == "__main__":
     # 初始化
     create_results_dir()
+    load_comparison_cache()
     
     # 显示主菜单
     main_menu()
\ No newline at end of file